@@ -0,0 +1,117 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+BIP44_PATH = "m/44'/60'/0'/0/{index}"
+
+# Unlocked keys by source, so a reload in the same process skips scrypt and derivation
+_unlocked = {}
+_unlocked_lock = threading.Lock()
+
+
+def _decrypt_keystore(path, password):
+    from eth_account import Account
+
+    with open(path) as f:
+        keyfile = json.load(f)
+    private_key = Account.decrypt(keyfile, password)
+    return Account.from_key(private_key).address, '0x' + bytes(private_key).hex()
+
+
+def _derive_keys(seed, indexes, path_template):
+    from eth_account import Account
+    from eth_account.hdaccount import key_from_seed
+
+    accounts = []
+    for index in indexes:
+        private_key = key_from_seed(seed, path_template.format(index=index))
+        accounts.append((Account.from_key(private_key).address, '0x' + private_key.hex()))
+    return accounts
+
+
+def _run_parallel(function, argument_lists, max_workers):
+    # A pool costs more than it saves for a single job
+    if len(argument_lists) <= 1 or max_workers == 1:
+        return [function(*arguments) for arguments in argument_lists]
+    with ProcessPoolExecutor(max_workers) as executor:
+        return list(executor.map(function, *zip(*argument_lists)))
+
+
+def _cached(key, load):
+    with _unlocked_lock:
+        if key in _unlocked:
+            return _unlocked[key]
+    accounts = load()
+    with _unlocked_lock:
+        _unlocked[key] = accounts
+    return accounts
+
+
+def load_env_accounts(checksum):
+    accounts = []
+    index = 1
+    while True:
+        address = os.getenv(f'ACCOUNT_ADDRESS_{index}')
+        private_key = os.getenv(f'PRIVATE_KEY_{index}')
+        if not address or not private_key:
+            break
+        accounts.append((checksum(address), private_key))
+        index += 1
+    return accounts
+
+
+def load_keystore_accounts(directory, password, max_workers=None):
+    paths = sorted(glob.glob(os.path.join(directory, '*')))
+    paths = [path for path in paths if os.path.isfile(path)]
+
+    def key(path):
+        return ('keystore', os.path.abspath(path), os.path.getmtime(path))
+
+    with _unlocked_lock:
+        missing = [path for path in paths if key(path) not in _unlocked]
+    # Each scrypt/PBKDF2 decryption is CPU and memory bound, so they run one per core
+    for path, account in zip(missing, _run_parallel(
+            _decrypt_keystore, [(path, password) for path in missing], max_workers)):
+        with _unlocked_lock:
+            _unlocked[key(path)] = account
+
+    with _unlocked_lock:
+        return [_unlocked[key(path)] for path in paths]
+
+
+def load_mnemonic_accounts(mnemonic, start, count, passphrase='', path_template=BIP44_PATH,
+                           max_workers=None, chunk_size=100):
+    def load():
+        from eth_account.hdaccount import seed_from_mnemonic
+
+        # The PBKDF2 seed is computed once, only the cheap child derivations are spread out
+        seed = seed_from_mnemonic(mnemonic, passphrase)
+        indexes = list(range(start, start + count))
+        chunks = [indexes[position:position + chunk_size] for position in range(0, len(indexes), chunk_size)]
+        results = _run_parallel(_derive_keys, [(seed, chunk, path_template) for chunk in chunks], max_workers)
+        return [account for chunk in results for account in chunk]
+
+    source = hashlib.sha256(f"{mnemonic}\0{passphrase}".encode()).hexdigest()
+    return _cached(('mnemonic', source, path_template, start, count), load)
+
+
+def load_all_accounts(checksum, keystore_dir=None, keystore_password='', mnemonic=None, mnemonic_start=0,
+                      mnemonic_count=0, max_workers=None):
+    accounts = load_env_accounts(checksum)
+    if keystore_dir:
+        accounts += load_keystore_accounts(keystore_dir, keystore_password, max_workers)
+    if mnemonic and mnemonic_count:
+        accounts += load_mnemonic_accounts(mnemonic, mnemonic_start, mnemonic_count, max_workers=max_workers)
+
+    # The same key can appear in more than one source, the first one wins
+    seen = set()
+    unique = []
+    for address, private_key in accounts:
+        address = checksum(address)
+        if address not in seen:
+            seen.add(address)
+            unique.append((address, private_key))
+    return unique
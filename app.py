@@ -1,11 +1,28 @@
-from web3 import Web3
 import time
+STARTUP_BEGIN = time.perf_counter()
+
+import argparse
 import os
 import secrets
 from dotenv import load_dotenv
 from datetime import datetime
 from colorama import Fore, Style, init
-from solcx import install_solc, set_solc_version, compile_source
+from account_sources import load_all_accounts
+from artifact_cache import artifact_cache, compile_contract
+from balance_ledger import NATIVE, BalanceLedger
+from batch_reads import BatchReader
+from deployment_registry import DeploymentRegistry
+from fee_oracle import FeeOracle
+from event_log import EVENTS, build_sinks, log_event
+from gas_profiles import GasProfileCache
+from metrics import metrics_middleware, start_http_server, start_snapshots, timed, write_snapshot
+from nonce_manager import NonceManager
+from rate_scheduler import RateScheduler
+from receipt_tracker import ReceiptTracker
+from receiver_pool import ReceiverPool
+from signing_pipeline import SigningPipeline
+from transactions import TransactionSender
+from tx_watchdog import StuckTransactionWatchdog
 
 # Initialize Colorama
 init(autoreset=True)
@@ -20,14 +37,76 @@ TOKEN_SYMBOL = Fore.MAGENTA + "DEZ" + Style.RESET_ALL
 # Load Environment Variables
 load_dotenv()
 
-# Solidity Configuration
-install_solc('0.8.0')
-set_solc_version('0.8.0')
+# Solidity Configuration (solc is only resolved on an artifact cache miss)
+SOLC_VERSION = '0.8.0'
 
 # Blockchain Configuration
 RPC_URL = os.getenv('RPC_URL', "https://zenchain-testnet.api.onfinality.io/public")
-CHAIN_ID = 8408
-web3 = Web3(Web3.HTTPProvider(RPC_URL))
+RPC_URLS = os.getenv('RPC_URLS', '')  # Comma-separated endpoint pool, overrides RPC_URL
+RPC_WRITE_URL = os.getenv('RPC_WRITE_URL', '')  # Preferred endpoint for sends, defaults to the first
+RPC_POOL_SIZE = int(os.getenv('RPC_POOL_SIZE', 20))
+RPC_BATCH_SIZE = int(os.getenv('RPC_BATCH_SIZE', 100))
+CHAIN_ID = int(os.getenv('CHAIN_ID', 8408))
+
+# Fee Configuration: FEE_MODE is 'legacy' (gasPrice) or 'eip1559' (eth_feeHistory)
+FEE_MODE = os.getenv('FEE_MODE', 'legacy')
+FEE_PERCENTILE = float(os.getenv('FEE_PERCENTILE', 50))
+FEE_TTL = float(os.getenv('FEE_TTL', 3))
+
+# Gas Configuration: limits come from estimate/observed gasUsed times this margin
+GAS_MARGIN = float(os.getenv('GAS_MARGIN', 1.2))
+
+# Receipt Configuration: one block-following tracker resolves every pending hash
+RECEIPT_POLL_INTERVAL = float(os.getenv('RECEIPT_POLL_INTERVAL', 1))
+RECEIPT_TIMEOUT = float(os.getenv('RECEIPT_TIMEOUT', 120))
+
+# Signing Configuration: SIGNER_WORKERS > 0 signs in a process pool, 0 signs inline (faster for this sequential loop)
+SIGNER_WORKERS = int(os.getenv('SIGNER_WORKERS', 0))
+SIGNER_QUEUE_SIZE = int(os.getenv('SIGNER_QUEUE_SIZE', 64))
+
+# Account Sources: ACCOUNT_ADDRESS_n/PRIVATE_KEY_n, plus an optional keystore directory and BIP-44 mnemonic range
+ACCOUNT_KEYSTORE_DIR = os.getenv('ACCOUNT_KEYSTORE_DIR', '')
+KEYSTORE_PASSWORD = os.getenv('KEYSTORE_PASSWORD', '')
+ACCOUNT_MNEMONIC = os.getenv('ACCOUNT_MNEMONIC', '')
+MNEMONIC_START = int(os.getenv('MNEMONIC_START', 0))
+MNEMONIC_COUNT = int(os.getenv('MNEMONIC_COUNT', 0))
+ACCOUNT_LOADER_WORKERS = int(os.getenv('ACCOUNT_LOADER_WORKERS', 0))  # 0 uses every core
+
+# Deployment Registry: the DEZ token is reused across restarts, empty disables it
+DEPLOYMENT_REGISTRY = os.getenv('DEPLOYMENT_REGISTRY', 'deployments.json')
+
+# Receiver Configuration: addresses are pre-generated into a bounded pool, or streamed from a file (one per line)
+RECEIVER_POOL_SIZE = int(os.getenv('RECEIVER_POOL_SIZE', 1000))
+RECEIVER_FILE = os.getenv('RECEIVER_FILE', '')
+
+# Stuck Transaction Configuration: seconds before an unmined nonce is re-sent with higher fees (0 = off),
+# bump per replacement in percent, replacements per nonce and the fee ceiling in gwei (0 = no ceiling)
+STUCK_AFTER = float(os.getenv('STUCK_AFTER', 45))
+FEE_BUMP_PERCENT = float(os.getenv('FEE_BUMP_PERCENT', 15))
+MAX_FEE_BUMPS = int(os.getenv('MAX_FEE_BUMPS', 5))
+MAX_FEE_GWEI = float(os.getenv('MAX_FEE_GWEI', 0))
+
+# Ledger Configuration: local balances are re-read from the chain after this many blocks (and after any revert)
+LEDGER_RECHECK_BLOCKS = int(os.getenv('LEDGER_RECHECK_BLOCKS', 50))
+
+# Rate Configuration: global token bucket shared by every account, 0 disables the limit
+TARGET_TPS = float(os.getenv('TARGET_TPS', 1))
+RATE_BURST = int(os.getenv('RATE_BURST', 2))
+
+# Metrics Configuration: Prometheus endpoint port (0 disables) and periodic JSON snapshot file (empty disables)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+METRICS_SNAPSHOT = os.getenv('METRICS_SNAPSHOT', '')
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv('METRICS_SNAPSHOT_INTERVAL', 60))
+
+# Log Configuration: console sink 'color', 'json' or 'off' (color lines per second, 0 = unlimited),
+# optional rotating JSON lines file, and the bounded queue in front of the background writer
+LOG_CONSOLE = os.getenv('LOG_CONSOLE', 'color')
+LOG_CONSOLE_RATE = int(os.getenv('LOG_CONSOLE_RATE', 20))
+LOG_FILE = os.getenv('LOG_FILE', '')
+LOG_FILE_MAX_BYTES = int(os.getenv('LOG_FILE_MAX_BYTES', 10 * 1024 * 1024))
+LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', 5))
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
 
 # Smart Contract Source Code
 STORAGE_CONTRACT_SOURCE = '''
@@ -106,88 +185,84 @@ contract DezToken is IERC20 {
 '''
 
 class TokenManager:
-    def __init__(self, web3):
+    def __init__(self, web3, tx_sender=None, registry=None):
         self.web3 = web3
+        self.tx_sender = tx_sender or TransactionSender(web3)
+        self.registry = registry
         self.token_contract = None
         self.token_address = None
 
+    @timed('token.deploy')
     def deploy_token(self, account_address, private_key, initial_supply):
         try:
-            compiled_sol = compile_source(TOKEN_CONTRACT_SOURCE)
-            contract_interface = compiled_sol['<stdin>:DezToken']
+            contract_interface = compile_contract(TOKEN_CONTRACT_SOURCE, 'DezToken', SOLC_VERSION)
+
+            if self.registry is not None:
+                entry = self.registry.lookup(self.web3, CHAIN_ID, 'DezToken', contract_interface['bin'], account_address)
+                if entry is not None:
+                    self.token_address = entry['address']
+                    self.token_contract = self.web3.eth.contract(address=self.token_address, abi=entry['abi'])
+                    log_event('ok', "Token DEZ dipakai ulang di {token}", account=account_address, token=self.token_address)
+                    return True
 
             DezToken = self.web3.eth.contract(
                 abi=contract_interface['abi'], 
                 bytecode=contract_interface['bin']
             )
             
-            transaction = DezToken.constructor(initial_supply).build_transaction({
-                'from': account_address,
-                'nonce': self.web3.eth.get_transaction_count(account_address),
-                'gas': 2000000,
-                'gasPrice': self.web3.eth.gas_price
-            })
-            
-            signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            tx_receipt = self.tx_sender.transact(
+                DezToken.constructor(initial_supply),
+                account_address, private_key
+            )
             
             self.token_address = tx_receipt.contractAddress
             self.token_contract = self.web3.eth.contract(address=self.token_address, abi=contract_interface['abi'])
-
-            print(Fore.GREEN + f"Token {TOKEN_SYMBOL} berhasil di-deploy di {self.token_address} {CHECK_MARK}")
+            if self.registry is not None:
+                self.registry.record(
+                    CHAIN_ID, 'DezToken', contract_interface['bin'], self.token_address, tx_receipt.blockNumber,
+                    contract_interface['abi'], account_address, initial_supply=initial_supply
+                )
+
+            log_event('ok', "Token DEZ berhasil di-deploy di {token}", account=account_address,
+                      token=self.token_address, receipt=tx_receipt)
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Gagal deploy token: {str(e)} {CROSS_MARK}")
+            log_event('error', "Gagal deploy token: {error}", account=account_address, error=e)
             return False
 
+    @timed('token.transfer')
     def send_token(self, from_address, private_key, to_address, amount):
         try:
-            transaction = self.token_contract.functions.transfer(
-                to_address, 
-                int(amount * 10**18)
-            ).build_transaction({
-                'from': from_address,
-                'nonce': self.web3.eth.get_transaction_count(from_address),
-                'gas': 200000,
-                'gasPrice': self.web3.eth.gas_price
-            })
-
-            signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            print(Fore.GREEN + f"Token {TOKEN_SYMBOL} berhasil dikirim ke {to_address} {CHECK_MARK}")
+            receipt = self.tx_sender.transact(
+                self.token_contract.functions.transfer(to_address, int(amount * 10**18)),
+                from_address, private_key
+            )
+
+            log_event('ok', "Token DEZ berhasil dikirim ke {to}", account=from_address, to=to_address,
+                      amount=amount, receipt=receipt)
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Gagal mengirim token: {str(e)} {CROSS_MARK}")
+            log_event('error', "Gagal mengirim token: {error}", account=from_address, error=e)
             return False
 
+    @timed('token.burn')
     def burn_token(self, from_address, private_key, amount):
         try:
-            transaction = self.token_contract.functions.burn(
-                int(amount * 10**18)
-            ).build_transaction({
-                'from': from_address,
-                'nonce': self.web3.eth.get_transaction_count(from_address),
-                'gas': 200000,
-                'gasPrice': self.web3.eth.gas_price
-            })
-
-            signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            print(Fore.GREEN + f"{TOKEN_SYMBOL} {amount} berhasil dibakar {CHECK_MARK}")
+            receipt = self.tx_sender.transact(
+                self.token_contract.functions.burn(int(amount * 10**18)),
+                from_address, private_key
+            )
+
+            log_event('ok', "DEZ {amount} berhasil dibakar", account=from_address, amount=amount, receipt=receipt)
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Gagal membakar token: {str(e)} {CROSS_MARK}")
+            log_event('error', "Gagal membakar token: {error}", account=from_address, error=e)
             return False
 
-def check_connection():
+def check_connection(web3):
     if web3.is_connected():
         print(Fore.GREEN + f"Terkoneksi dengan jaringan Zenchain Testnet {CHECK_MARK}")
         return True
@@ -195,112 +270,181 @@ def check_connection():
         print(Fore.RED + f"Gagal terhubung ke jaringan Zenchain Testnet {CROSS_MARK}")
         return False
 
-def get_balance(address):
-    return web3.from_wei(web3.eth.get_balance(address), 'ether')
+def native_balances(batch_reader, ledger, addresses):
+    # The ledger answers from our own receipts, one batched read covers the accounts it can no longer vouch for
+    ledger.seed(NATIVE, batch_reader.native_balances(ledger.needs_refresh(NATIVE, addresses)))
+    return {address: ledger.native_balance(address) for address in addresses}
 
-def deploy_storage_contract(account_address, private_key):
+@timed('storage.deploy')
+def deploy_storage_contract(web3, account_address, private_key, tx_sender=None):
     try:
-        compiled_sol = compile_source(STORAGE_CONTRACT_SOURCE)
-        contract_interface = compiled_sol['<stdin>:SimpleStorage']
+        tx_sender = tx_sender or TransactionSender(web3)
+        contract_interface = compile_contract(STORAGE_CONTRACT_SOURCE, 'SimpleStorage', SOLC_VERSION)
 
         SimpleStorage = web3.eth.contract(
             abi=contract_interface['abi'],
             bytecode=contract_interface['bin']
         )
 
-        transaction = SimpleStorage.constructor().build_transaction({
-            'from': account_address,
-            'nonce': web3.eth.get_transaction_count(account_address),
-            'gas': 2000000,
-            'gasPrice': web3.eth.gas_price
-        })
-
-        signed_tx = web3.eth.account.sign_transaction(transaction, private_key)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_receipt = tx_sender.transact(
+            SimpleStorage.constructor(),
+            account_address, private_key
+        )
 
-        print(Fore.GREEN + f"Storage Contract berhasil di-deploy di {tx_receipt.contractAddress} {CHECK_MARK}")
+        log_event('ok', "Storage Contract berhasil di-deploy di {contract}", account=account_address,
+                  contract=tx_receipt.contractAddress, receipt=tx_receipt)
         return tx_receipt.contractAddress
 
     except Exception as e:
-        print(Fore.RED + f"Gagal deploy storage contract: {str(e)} {CROSS_MARK}")
+        log_event('error', "Gagal deploy storage contract: {error}", account=account_address, error=e)
         return None
 
-def send_native_token(sender_address, private_key, receiver_address, amount):
+@timed('native.send')
+def send_native_token(web3, sender_address, private_key, receiver_address, amount, tx_sender=None):
     try:
+        tx_sender = tx_sender or TransactionSender(web3)
         transaction = {
-            'nonce': web3.eth.get_transaction_count(sender_address),
             'to': receiver_address,
             'value': web3.to_wei(amount, 'ether'),
             'gas': 21000,
-            'gasPrice': web3.eth.gas_price,
             'chainId': CHAIN_ID
         }
 
-        signed_tx = web3.eth.account.sign_transaction(transaction, private_key)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        web3.eth.wait_for_transaction_receipt(tx_hash)
+        receipt = tx_sender.send(transaction, sender_address, private_key)
 
-        print(Fore.GREEN + f"Native token berhasil dikirim ke {receiver_address} {CHECK_MARK}")
+        log_event('ok', "Native token berhasil dikirim ke {to}", account=sender_address, to=receiver_address,
+                  receipt=receipt)
         return True
 
     except Exception as e:
-        print(Fore.RED + f"Gagal mengirim native token: {str(e)} {CROSS_MARK}")
+        log_event('error', "Gagal mengirim native token: {error}", account=sender_address, error=e)
         return False
 
-def load_accounts():
-    accounts = []
-    index = 1
-    while True:
-        address = os.getenv(f'ACCOUNT_ADDRESS_{index}')
-        private_key = os.getenv(f'PRIVATE_KEY_{index}')
-        if not address or not private_key:
-            break
-        accounts.append((web3.to_checksum_address(address), private_key))
-        index += 1
-    return accounts
+def load_accounts(web3):
+    return load_all_accounts(
+        web3.to_checksum_address, ACCOUNT_KEYSTORE_DIR, KEYSTORE_PASSWORD,
+        ACCOUNT_MNEMONIC, MNEMONIC_START, MNEMONIC_COUNT, ACCOUNT_LOADER_WORKERS or None
+    )
+
+def load_artifacts():
+    compile_contract(TOKEN_CONTRACT_SOURCE, 'DezToken', SOLC_VERSION)
+    compile_contract(STORAGE_CONTRACT_SOURCE, 'SimpleStorage', SOLC_VERSION)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Otomatisasi Zenchain Testnet untuk ZCX dan token DEZ")
+    parser.add_argument('--precompile', action='store_true',
+                        help="compile semua kontrak ke artifact cache lalu keluar")
+    return parser.parse_args()
+
+def print_dropped_report(receipt_tracker):
+    dropped = receipt_tracker.dropped_report() if receipt_tracker else []
+    if dropped:
+        print(Fore.YELLOW + "Transaksi yang hilang atau belum terkonfirmasi:")
+        for entry in dropped:
+            print(Fore.YELLOW + f"  {entry['tx_hash']} {entry['status']} setelah {entry['waited']}s")
+
+def print_replacement_report(watchdog):
+    outcomes = watchdog.report() if watchdog else []
+    if outcomes:
+        print(Fore.YELLOW + "Transaksi pengganti dengan fee lebih tinggi:")
+        for outcome in outcomes:
+            print(Fore.YELLOW + f"  {outcome['account']} nonce {outcome['nonce']}: {outcome['status']} "
+                  f"setelah {outcome['attempts']} percobaan")
 
 def main():
-    if not check_connection():
+    args = parse_args()
+    EVENTS.configure(
+        build_sinks(LOG_CONSOLE, LOG_CONSOLE_RATE, LOG_FILE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS), LOG_QUEUE_SIZE
+    )
+    load_artifacts()
+    print(Fore.CYAN + f"Startup siap dalam {time.perf_counter() - STARTUP_BEGIN:.2f}s "
+          f"(artifact cache {artifact_cache.stats()})")
+    if args.precompile:
+        return
+
+    # Heavy imports are deferred until we actually talk to the chain
+    from web3 import Web3
+    from rpc_pool import build_provider
+
+    web3 = Web3(build_provider(RPC_URL, RPC_URLS, RPC_WRITE_URL, pool_size=RPC_POOL_SIZE))
+    web3.middleware_onion.add(metrics_middleware(), 'metrics')
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT, METRICS_HOST)
+        print(Fore.CYAN + f"Metrik tersedia di http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    if METRICS_SNAPSHOT:
+        start_snapshots(METRICS_SNAPSHOT, METRICS_SNAPSHOT_INTERVAL)
+    fee_oracle = FeeOracle(web3, FEE_TTL, FEE_MODE == 'eip1559', FEE_PERCENTILE)
+    receipt_tracker = ReceiptTracker(web3, RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT)
+    signer = SigningPipeline(SIGNER_WORKERS, SIGNER_QUEUE_SIZE) if SIGNER_WORKERS > 0 else None
+    tx_sender = TransactionSender(
+        web3, NonceManager(web3), fee_oracle, CHAIN_ID, GasProfileCache(web3, GAS_MARGIN), receipt_tracker, signer
+    )
+    if STUCK_AFTER > 0:
+        tx_sender.watchdog = StuckTransactionWatchdog(
+            tx_sender, STUCK_AFTER, FEE_BUMP_PERCENT, MAX_FEE_BUMPS, Web3.to_wei(MAX_FEE_GWEI, 'gwei')
+        )
+
+    if not check_connection(web3):
         return
+    ledger = tx_sender.ledger = BalanceLedger(LEDGER_RECHECK_BLOCKS, web3.eth.block_number)
 
-    accounts = load_accounts()
+    accounts = load_accounts(web3)
     if not accounts:
         print(Fore.RED + "Tidak ada akun yang ditemukan di file .env")
         return
 
-    token_manager = TokenManager(web3)
+    registry = DeploymentRegistry(DEPLOYMENT_REGISTRY) if DEPLOYMENT_REGISTRY else None
+    token_manager = TokenManager(web3, tx_sender, registry)
 
-    print(Fore.CYAN + "\nMemulai proses deployment token DEZ...")
+    batch_reader = BatchReader(web3, RPC_BATCH_SIZE)
+    addresses = [address for address, _ in accounts]
+    # Accounts run one after another here, a per-account bucket would only stall the loop
+    scheduler = RateScheduler(TARGET_TPS, RATE_BURST)
+    receiver_pool = ReceiverPool(RECEIVER_POOL_SIZE, RECEIVER_FILE or None)
+
+    log_event('info', "Memulai proses deployment token DEZ...")
     token_manager.deploy_token(accounts[0][0], accounts[0][1], 1000000)
 
     try:
         while True:
-            for sender_address, private_key in accounts:
-                print("\n" + Fore.YELLOW + "=" * 50)
-                print(Fore.CYAN + f"Memproses akun: {sender_address}")
-
-                random_receiver = web3.eth.account.create()
-                print(Fore.CYAN + f"Alamat penerima acak: {random_receiver.address}")
+            initial_balances = native_balances(batch_reader, ledger, addresses)
 
-                initial_balance = get_balance(sender_address)
-                print(Fore.BLUE + f"{BALANCE_SYMBOL} Saldo Awal: {initial_balance} {ZEN_SYMBOL}")
-
-                send_native_token(sender_address, private_key, random_receiver.address, 0.00001)
-                deploy_storage_contract(sender_address, private_key)
-                token_manager.send_token(sender_address, private_key, random_receiver.address, 100)
+            for sender_address, private_key in accounts:
+                random_receiver = receiver_pool.next()
+                log_event('info', "Memproses akun: {account}, penerima acak {to}, saldo awal {balance} ZCX",
+                          account=sender_address, to=random_receiver,
+                          balance=web3.from_wei(initial_balances[sender_address], 'ether'))
+
+                scheduler.wait(sender_address)
+                send_native_token(web3, sender_address, private_key, random_receiver, 0.00001, tx_sender)
+                scheduler.wait(sender_address)
+                deploy_storage_contract(web3, sender_address, private_key, tx_sender)
+                scheduler.wait(sender_address)
+                token_manager.send_token(sender_address, private_key, random_receiver, 100)
+                scheduler.wait(sender_address)
                 token_manager.burn_token(sender_address, private_key, 10)
 
-                final_balance = get_balance(sender_address)
-                print(Fore.BLUE + f"{BALANCE_SYMBOL} Saldo Akhir: {final_balance} {ZEN_SYMBOL}")
+            log_event('info', "Laju transaksi: {rate}", rate=scheduler.report())
 
-                print(Fore.YELLOW + "=" * 50 + "\n")
-                time.sleep(10)
+            final_balances = native_balances(batch_reader, ledger, addresses)
+            for address in addresses:
+                log_event('info', "Saldo Akhir {account}: {balance} ZCX", account=address,
+                          balance=web3.from_wei(final_balances[address], 'ether'))
 
     except KeyboardInterrupt:
+        EVENTS.close()
         print(Fore.YELLOW + "\n🔴 Program dihentikan oleh user")
+        print_dropped_report(receipt_tracker)
+        print_replacement_report(tx_sender.watchdog)
+        if METRICS_SNAPSHOT:
+            write_snapshot(METRICS_SNAPSHOT)
     except Exception as e:
+        EVENTS.close()
         print(Fore.RED + f"\nTerjadi kesalahan: {str(e)}")
+    finally:
+        EVENTS.close()
+        if signer is not None:
+            signer.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+
+ARTIFACT_CACHE_DIR = os.getenv('ARTIFACT_CACHE_DIR', '.artifacts')
+
+
+def _sha256(data):
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _compile(source, solc_version, settings):
+    # solcx is only imported, and solc only installed, when a compile is unavoidable
+    import solcx
+
+    installed = [str(version) for version in solcx.get_installed_solc_versions()]
+    if str(solc_version) not in installed:
+        solcx.install_solc(solc_version)
+    return solcx.compile_source(
+        source,
+        output_values=['abi', 'bin'],
+        solc_version=solc_version,
+        **settings
+    )
+
+
+class ArtifactCache:
+    def __init__(self, cache_dir=ARTIFACT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def cache_key(self, source, solc_version, settings=None):
+        payload = json.dumps({
+            'source': _sha256(source),
+            'solc_version': str(solc_version),
+            'settings': settings or {}
+        }, sort_keys=True)
+        return _sha256(payload)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, artifacts):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(key) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(artifacts, f)
+        os.replace(tmp_path, self._path(key))
+
+    def get(self, source, contract_name, solc_version, settings=None):
+        key = self.cache_key(source, solc_version, settings)
+        # Held across the compile so concurrent callers never run solc twice
+        with self._lock:
+            artifacts = self._memory.get(key)
+            if artifacts is None:
+                artifacts = self._load(key)
+                if artifacts is not None:
+                    self._memory[key] = artifacts
+            if artifacts is not None:
+                self.hits += 1
+                return artifacts[contract_name]
+
+            self.misses += 1
+            compiled = _compile(source, solc_version, settings or {})
+            artifacts = {
+                name.split(':')[-1]: {'abi': output['abi'], 'bin': output['bin']}
+                for name, output in compiled.items()
+            }
+            self._memory[key] = artifacts
+            self._store(key, artifacts)
+            return artifacts[contract_name]
+
+    def invalidate(self, source=None, solc_version=None, settings=None):
+        with self._lock:
+            if source is None:
+                keys = list(self._memory)
+                if os.path.isdir(self.cache_dir):
+                    keys += [name[:-5] for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+            else:
+                keys = [self.cache_key(source, solc_version, settings)]
+
+            for key in set(keys):
+                self._memory.pop(key, None)
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+artifact_cache = ArtifactCache()
+
+
+def compile_contract(source, contract_name, solc_version, settings=None):
+    return artifact_cache.get(source, contract_name, solc_version, settings)
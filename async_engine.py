@@ -0,0 +1,80 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from event_log import log_event
+
+
+class AsyncEngine:
+    # The managers are blocking web3 code, so each operation runs on a bounded
+    # thread pool while asyncio does the scheduling and the rate scheduler does the pacing.
+    def __init__(self, scheduler, max_concurrency=16, per_account_concurrency=1):
+        self.scheduler = scheduler
+        self.max_concurrency = max_concurrency
+        self.per_account_concurrency = per_account_concurrency
+        self.completed = 0
+        self.failed = 0
+        self.started_at = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._global_limit = None
+        self._in_flight = set()
+
+    async def _run_operation(self, account, account_limit, name, operation):
+        try:
+            async with self._global_limit:
+                loop = asyncio.get_running_loop()
+                try:
+                    result = await loop.run_in_executor(self._executor, operation)
+                except Exception as e:
+                    log_event('error', "Operation {name} crashed: {error}", account=account, name=name, error=e)
+                    result = False
+        finally:
+            account_limit.release()
+        if result is False or result is None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    async def _account_worker(self, account, build_operations):
+        account_limit = asyncio.Semaphore(self.per_account_concurrency)
+        operations = build_operations(*account)
+        picks = 0
+        while True:
+            # Waiting on a free slot or on the buckets only holds back this account
+            await account_limit.acquire()
+            await self.scheduler.wait_async(account[0])
+            name, operation = self.scheduler.choose(operations)
+            task = asyncio.create_task(self._run_operation(account[0], account_limit, name, operation))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+            picks += 1
+            # Fresh receivers once the account has done about one round of the mix
+            if picks % len(operations) == 0:
+                operations = build_operations(*account)
+
+    async def _report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            log_event('info', "Throughput: {throughput:.2f} ops/s ({completed} ok, {failed} failed), rate {rate}",
+                      throughput=self.throughput(), completed=self.completed, failed=self.failed,
+                      rate=self.scheduler.report())
+
+    def throughput(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.completed + self.failed) / max(time.monotonic() - self.started_at, 1e-9)
+
+    async def run(self, accounts, build_operations, report_interval=60):
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self.started_at = time.monotonic()
+        workers = [
+            asyncio.create_task(self._account_worker(account, build_operations))
+            for account in accounts
+        ]
+        reporter = asyncio.create_task(self._report(report_interval))
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            reporter.cancel()
+            for task in workers + list(self._in_flight):
+                task.cancel()
+            self._executor.shutdown(wait=False, cancel_futures=True)
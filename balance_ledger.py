@@ -0,0 +1,103 @@
+import threading
+from event_log import log_event
+from nft_index import decode_logs
+
+TOKEN_EVENTS = ('Transfer', 'Mint', 'Burn')
+
+NATIVE = 'native'
+TOKEN = 'token'
+
+
+class BalanceLedger:
+    # Native and token balances of our own accounts, moved by our own receipts. An entry is only
+    # trusted until recheck_blocks have been mined past its last chain read or its account reverts.
+    def __init__(self, recheck_blocks=50, latest_block=0):
+        self.recheck_blocks = max(recheck_blocks, 1)
+        self.token_contract = None
+        self.corrections = 0
+        self._balances = {}  # (kind, account) -> balance
+        self._checked = {}  # (kind, account) -> newest receipt block seen when it was read from the chain
+        # Start at the chain head, otherwise the first receipt would age every earlier seed past recheck_blocks
+        self._latest_block = latest_block
+        self._lock = threading.Lock()
+
+    def attach_token(self, token_contract):
+        with self._lock:
+            self.token_contract = token_contract
+            for key in [key for key in self._balances if key[0] == TOKEN]:
+                del self._balances[key]
+                self._checked.pop(key, None)
+
+    def _fresh(self, key):
+        checked = self._checked.get(key)
+        return checked is not None and self._latest_block - checked < self.recheck_blocks
+
+    def _balance(self, kind, address):
+        with self._lock:
+            key = (kind, address)
+            return self._balances[key] if self._fresh(key) else None
+
+    def native_balance(self, address):
+        return self._balance(NATIVE, address)
+
+    def token_balance(self, address):
+        return self._balance(TOKEN, address)
+
+    def needs_refresh(self, kind, addresses):
+        with self._lock:
+            return [address for address in addresses if not self._fresh((kind, address))]
+
+    def seed(self, kind, balances):
+        # Chain reads replace whatever the receipts predicted, a difference is a correction
+        corrected = []
+        with self._lock:
+            for address, balance in balances.items():
+                key = (kind, address)
+                if key in self._balances and self._balances[key] != balance:
+                    corrected.append((address, self._balances[key], balance))
+                self._balances[key] = balance
+                self._checked[key] = self._latest_block
+            self.corrections += len(corrected)
+        for address, expected, actual in corrected:
+            log_event('info', "Ledger {kind} balance of {account} corrected from {expected} to {actual}",
+                      kind=kind, account=address, expected=expected, actual=actual)
+
+    def invalidate(self, address):
+        with self._lock:
+            self._checked.pop((NATIVE, address), None)
+            self._checked.pop((TOKEN, address), None)
+
+    def _add(self, kind, address, delta):
+        key = (kind, address)
+        # Only accounts read from the chain are tracked, random receivers stay out of the ledger
+        if key in self._balances:
+            self._balances[key] += delta
+
+    def apply_receipt(self, from_address, value, receipt):
+        reverted = not receipt['status']
+        token_contract = self.token_contract
+        events = []
+        if not reverted and token_contract is not None:
+            events = decode_logs(
+                token_contract, [log for log in receipt['logs'] if log['address'] == token_contract.address],
+                TOKEN_EVENTS
+            )
+
+        with self._lock:
+            self._latest_block = max(self._latest_block, receipt['blockNumber'])
+            self._add(NATIVE, from_address, -receipt['gasUsed'] * receipt['effectiveGasPrice'])
+            if reverted:
+                # Whatever the transaction was meant to move did not happen, the next use re-reads
+                self._checked.pop((NATIVE, from_address), None)
+                self._checked.pop((TOKEN, from_address), None)
+                return
+            if value:
+                self._add(NATIVE, from_address, -value)
+                if receipt['to'] is not None:
+                    self._add(NATIVE, receipt['to'], value)
+            for event in events:
+                args = event['args']
+                if event['event'] in ('Transfer', 'Burn'):
+                    self._add(TOKEN, args['from'], -args['value'])
+                if event['event'] in ('Transfer', 'Mint'):
+                    self._add(TOKEN, args['to'], args['value'])
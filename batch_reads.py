@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class AccountState:
+    address: str
+    native_balance: int
+    nonce: int
+    token_balance: Optional[int] = None
+
+
+class BatchReader:
+    def __init__(self, web3, max_batch_size=100):
+        self.web3 = web3
+        self.max_batch_size = max_batch_size
+        self.round_trips = 0
+        self._batching_supported = True
+
+    def _execute_chunk(self, calls):
+        self.round_trips += 1
+        with self.web3.batch_requests() as batch:
+            for call in calls:
+                batch.add(call())
+            return batch.execute()
+
+    def _execute_single(self, call):
+        request = call()
+        # Contract reads come back unexecuted, outside a batch they still need .call()
+        return request.call() if hasattr(request, 'call') else request
+
+    def execute(self, calls):
+        # Each call is a zero-argument callable, web3 only queues requests made inside the batch
+        if not self._batching_supported:
+            self.round_trips += len(calls)
+            return [self._execute_single(call) for call in calls]
+
+        results = []
+        index = 0
+        while index < len(calls):
+            chunk = calls[index:index + self.max_batch_size]
+            try:
+                results.extend(self._execute_chunk(chunk))
+                index += len(chunk)
+            except Exception as e:
+                if 'not supported by this provider' in str(e):
+                    self._batching_supported = False
+                    return results + self.execute(calls[index:])
+                # Providers reject oversized batches in different ways, so any failure halves it
+                if len(chunk) == 1:
+                    raise
+                self.max_batch_size = max(1, len(chunk) // 2)
+        return results
+
+    def native_balances(self, addresses):
+        balances = self.execute([
+            (lambda address=address: self.web3.eth.get_balance(address)) for address in addresses
+        ])
+        return dict(zip(addresses, balances))
+
+    def account_states(self, addresses, token_contract=None):
+        calls = []
+        for address in addresses:
+            calls.append(lambda address=address: self.web3.eth.get_balance(address))
+            calls.append(lambda address=address: self.web3.eth.get_transaction_count(address, 'pending'))
+            if token_contract is not None:
+                calls.append(lambda address=address: token_contract.functions.balanceOf(address))
+
+        results = self.execute(calls)
+        width = 3 if token_contract is not None else 2
+        states = []
+        for position, address in enumerate(addresses):
+            row = results[position * width:(position + 1) * width]
+            states.append(AccountState(
+                address=address,
+                native_balance=row[0],
+                nonce=row[1],
+                token_balance=row[2] if token_contract is not None else None
+            ))
+        return states
@@ -0,0 +1,273 @@
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from colorama import Fore, init
+from event_log import EVENTS, build_sinks
+from rate_scheduler import RateScheduler, parse_weights
+
+init(autoreset=True)
+
+OPERATION_NAMES = (
+    'send_native', 'deploy_storage', 'send_tokens', 'transfer_nfts',
+    'burn_tokens', 'burn_nfts', 'mint_tokens', 'mint_nfts'
+)
+
+
+def percentile(values, percent):
+    # Nearest rank, so every reported latency is one that was actually measured
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def rpc_counter(counts, background):
+    from web3.middleware import Web3Middleware
+
+    def counter():
+        # Receipt polling and the watchdog run on their own threads, kept apart from the operations' calls
+        thread = threading.current_thread()
+        return counts if thread is threading.main_thread() else background[thread.name]
+
+    class RPCCounter(Web3Middleware):
+        def wrap_make_request(self, make_request):
+            def middleware(method, params):
+                counter()[method] += 1
+                return make_request(method, params)
+            return middleware
+
+        def wrap_make_batch_request(self, make_batch_request):
+            # One round trip however many requests it carries
+            def middleware(requests_info):
+                counter()['batch'] += 1
+                return make_batch_request(requests_info)
+            return middleware
+
+    return RPCCounter
+
+
+def connect(rpc_url=None):
+    from web3 import Web3
+
+    if rpc_url:
+        return Web3(Web3.HTTPProvider(rpc_url))
+    try:
+        from web3 import EthereumTesterProvider
+        return Web3(EthereumTesterProvider())
+    except Exception as e:
+        raise SystemExit(f"In-process chain unavailable ({e}), install eth-tester[py-evm] or pass --rpc-url")
+
+
+def seeded_accounts(seed, count):
+    from eth_account import Account
+
+    rng = random.Random(seed)
+    accounts = []
+    for _ in range(count):
+        private_key = '0x' + rng.randbytes(32).hex()
+        accounts.append((Account.from_key(private_key).address, private_key))
+    return accounts
+
+
+def fund_accounts(web3, accounts, amount_ether):
+    # The local chain's unlocked accounts pay for the workload, this stays outside the measurement
+    funder = web3.eth.accounts[0]
+    for address, _ in accounts:
+        tx_hash = web3.eth.send_transaction({'from': funder, 'to': address, 'value': web3.to_wei(amount_ether, 'ether')})
+        web3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def run(args):
+    web3 = connect(args.rpc_url)
+    # Transactions are signed for the chain under test, main reads CHAIN_ID at import
+    os.environ['CHAIN_ID'] = str(web3.eth.chain_id)
+    os.environ['INDEXER_DB'] = ''
+    os.environ['DEPLOYMENT_REGISTRY'] = ''
+    import main as bot
+
+    counts = Counter()
+    background = defaultdict(Counter)
+    web3.middleware_onion.add(rpc_counter(counts, background), 'rpc_counter')
+
+    tx_sender = bot.TransactionSender(
+        web3, bot.NonceManager(web3), bot.FeeOracle(web3, bot.FEE_TTL, bot.FEE_MODE == 'eip1559', bot.FEE_PERCENTILE),
+        bot.CHAIN_ID, bot.GasProfileCache(web3, bot.GAS_MARGIN), bot.ReceiptTracker(web3, args.poll_interval, 60)
+    )
+    # Same watchdog and ledger as main(), so the RPC counts measure the pipeline the bot really runs
+    if bot.STUCK_AFTER > 0:
+        tx_sender.watchdog = bot.StuckTransactionWatchdog(
+            tx_sender, bot.STUCK_AFTER, bot.FEE_BUMP_PERCENT, bot.MAX_FEE_BUMPS, web3.to_wei(bot.MAX_FEE_GWEI, 'gwei')
+        )
+    tx_sender.ledger = bot.BalanceLedger(bot.LEDGER_RECHECK_BLOCKS, web3.eth.block_number)
+    multicall = bot.Multicall(web3, bot.SOLC_VERSION, tx_sender, bot.MULTICALL_BATCH_SIZE)
+    token_manager = bot.TokenManager(web3, tx_sender, multicall)
+    nft_manager = bot.NFTManager(web3, tx_sender, multicall)
+    clone_factory = bot.CloneFactory(web3, bot.SOLC_VERSION, tx_sender)
+    scheduler = RateScheduler(0, weights=parse_weights(args.weights))
+
+    accounts = seeded_accounts(args.seed, args.accounts)
+    random.seed(args.seed)
+    # The bot's events go through the shared log, silenced unless asked for
+    EVENTS.configure(build_sinks() if args.verbose else [])
+    try:
+        fund_accounts(web3, accounts, args.fund)
+        owner, owner_key = accounts[0]
+        try:
+            multicall.ensure(owner, owner_key, bot.MULTICALL_ADDRESS)
+        except Exception:
+            pass
+        token_manager.deploy_token(owner, owner_key)
+        nft_manager.deploy_nft(owner, owner_key)
+        for address, _ in accounts[1:]:
+            # Every account starts with DEZ and NFTs so transfers and burns have something to move
+            token_manager.mint_random_amount(owner, owner_key, address)
+            nft_manager.mint_random_nfts(owner, owner_key, address)
+
+        operations = {
+            address: bot.build_operations(
+                web3, tx_sender, token_manager, nft_manager, address, private_key, clone_factory, args.storage_mode
+            )
+            for address, private_key in accounts
+        }
+
+        counts.clear()
+        background.clear()
+        samples = []
+        started = time.perf_counter()
+        for _ in range(args.operations):
+            for address, _ in accounts:
+                name, operation = scheduler.choose(operations[address])
+                first_block = web3.eth.block_number
+                calls = sum(counts.values())
+                operation_started = time.perf_counter()
+                try:
+                    ok = operation() not in (False, None)
+                except Exception:
+                    ok = False
+                latency = time.perf_counter() - operation_started
+                calls = sum(counts.values()) - calls
+                samples.append((name, latency, ok, calls, first_block, web3.eth.block_number))
+        duration = time.perf_counter() - started
+        # Bookkeeping reads between operations are not the bot's own traffic
+        rpc_calls = Counter({method: count for method, count in counts.items()})
+        rpc_calls['eth_blockNumber'] -= 2 * len(samples)
+        tx_sender.receipt_tracker.stop()
+        if tx_sender.watchdog is not None:
+            tx_sender.watchdog.stop()
+        background_calls = {name: dict(calls) for name, calls in sorted(background.items())}
+    finally:
+        EVENTS.close()
+
+    tx_hashes = set()
+    gas_by_block = {}
+    per_operation = defaultdict(lambda: {'latencies': [], 'failed': 0, 'rpc_calls': 0, 'transactions': 0, 'gas': 0})
+    for name, latency, ok, calls, first_block, last_block in samples:
+        stats = per_operation[name]
+        stats['latencies'].append(latency)
+        stats['failed'] += not ok
+        stats['rpc_calls'] += calls
+        for number in range(first_block + 1, last_block + 1):
+            if number not in gas_by_block:
+                block = web3.eth.get_block(number)
+                gas_by_block[number] = (block['gasUsed'], len(block['transactions']))
+                tx_hashes.update(block['transactions'])
+            gas, transactions = gas_by_block[number]
+            stats['gas'] += gas
+            stats['transactions'] += transactions
+
+    transactions = len(tx_hashes)
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'config': {
+            'seed': args.seed, 'accounts': args.accounts, 'operations': args.operations,
+            'weights': args.weights, 'storage_mode': args.storage_mode,
+            'chain': args.rpc_url or 'eth-tester', 'chain_id': bot.CHAIN_ID
+        },
+        'duration': round(duration, 3),
+        'transactions': transactions,
+        'tx_per_second': round(transactions / duration, 3) if duration else 0,
+        'rpc_calls': dict(rpc_calls),
+        'rpc_calls_per_tx': round(sum(rpc_calls.values()) / transactions, 3) if transactions else None,
+        'background_rpc_calls': background_calls,
+        'operations': {
+            name: {
+                'count': len(stats['latencies']),
+                'failed': stats['failed'],
+                'p50': round(percentile(stats['latencies'], 50), 4),
+                'p95': round(percentile(stats['latencies'], 95), 4),
+                'p99': round(percentile(stats['latencies'], 99), 4),
+                'transactions': stats['transactions'],
+                'rpc_calls_per_op': round(stats['rpc_calls'] / len(stats['latencies']), 2),
+                'gas_per_op': stats['gas'] // len(stats['latencies'])
+            }
+            for name, stats in sorted(per_operation.items())
+        }
+    }
+
+
+def print_report(result, baseline=None):
+    def delta(current, previous, lower_is_better=False):
+        if not previous or current is None:
+            return ''
+        change = (current - previous) / previous
+        worse = change > 0 if lower_is_better else change < 0
+        return (Fore.RED if worse and abs(change) > 0.05 else Fore.GREEN) + f" ({change:+.1%})" + Fore.RESET
+
+    previous = (baseline or {}).get('operations', {})
+    print(Fore.CYAN + f"\n{result['transactions']} transactions in {result['duration']}s: "
+          f"{result['tx_per_second']} tx/s{delta(result['tx_per_second'], (baseline or {}).get('tx_per_second'))}, "
+          f"{result['rpc_calls_per_tx']} RPC calls per tx")
+    for name, calls in result.get('background_rpc_calls', {}).items():
+        print(Fore.CYAN + f"{name}: {sum(calls.values())} background RPC calls")
+    print(Fore.CYAN + f"{'operation':<16}{'count':>7}{'failed':>8}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'rpc/op':>8}{'gas/op':>10}")
+    for name, stats in result['operations'].items():
+        print(f"{name:<16}{stats['count']:>7}{stats['failed']:>8}{stats['p50']:>9}{stats['p95']:>9}{stats['p99']:>9}"
+              f"{stats['rpc_calls_per_op']:>8}{stats['gas_per_op']:>10}"
+              f"{delta(stats['p95'], previous.get(name, {}).get('p95'), lower_is_better=True)}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Throughput benchmark for the bot's operations on a local chain")
+    parser.add_argument('--rpc-url', help="local dev node with unlocked funded accounts, default is in-process eth-tester")
+    parser.add_argument('--seed', type=int, default=1, help="seeds the accounts, the operation mix and the amounts")
+    parser.add_argument('--accounts', type=int, default=3)
+    parser.add_argument('--operations', type=int, default=20, help="operations per account")
+    parser.add_argument('--weights', default='', help="operation mix, e.g. send_native:3,mint_nfts:1")
+    parser.add_argument('--storage-mode', choices=('full', 'clone', 'create2'), default='full')
+    parser.add_argument('--fund', type=float, default=100, help="ether given to each benchmark account")
+    parser.add_argument('--poll-interval', type=float, default=0.05, help="receipt poll interval")
+    parser.add_argument('--output', help="result file, default benchmarks/<timestamp>.json")
+    parser.add_argument('--baseline', help="earlier result file to compare against")
+    parser.add_argument('--verbose', action='store_true', help="keep the bot's own output")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    unknown = set(parse_weights(args.weights)) - set(OPERATION_NAMES)
+    if unknown:
+        raise SystemExit(f"Unknown operations in --weights: {', '.join(sorted(unknown))} (choose from {', '.join(OPERATION_NAMES)})")
+
+    result = run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    output = args.output or os.path.join('benchmarks', datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(Fore.GREEN + f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import threading
+
+from eth_utils import keccak, to_checksum_address
+from artifact_cache import compile_contract
+from nft_index import decode_logs
+
+CLONE_FACTORY_SOURCE = '''
+pragma solidity ^0.8.0;
+
+contract CloneFactory {
+    event CloneCreated(address indexed implementation, address instance, bytes32 salt);
+
+    function clone(address implementation, bytes calldata initData) external returns (address instance) {
+        bytes memory code = _proxyCode(implementation);
+        assembly {
+            instance := create(0, add(code, 0x20), mload(code))
+        }
+        _initialize(implementation, instance, initData, bytes32(0));
+    }
+
+    function cloneDeterministic(address implementation, bytes32 salt, bytes calldata initData)
+        external returns (address instance)
+    {
+        bytes memory code = _proxyCode(implementation);
+        assembly {
+            instance := create2(0, add(code, 0x20), mload(code), salt)
+        }
+        _initialize(implementation, instance, initData, salt);
+    }
+
+    function _proxyCode(address implementation) internal pure returns (bytes memory) {
+        // EIP-1167 minimal proxy: delegates every call to the implementation
+        return abi.encodePacked(
+            hex"3d602d80600a3d3981f3363d3d373d3d3d363d73",
+            implementation,
+            hex"5af43d82803e903d91602b57fd5bf3"
+        );
+    }
+
+    function _initialize(address implementation, address instance, bytes calldata initData, bytes32 salt) internal {
+        require(instance != address(0), "Clone failed");
+        if (initData.length > 0) {
+            (bool success, ) = instance.call(initData);
+            require(success, "Initialize failed");
+        }
+        emit CloneCreated(implementation, instance, salt);
+    }
+}
+'''
+
+PROXY_PREFIX = bytes.fromhex('3d602d80600a3d3981f3363d3d373d3d3d363d73')
+PROXY_SUFFIX = bytes.fromhex('5af43d82803e903d91602b57fd5bf3')
+
+
+def proxy_init_code(implementation):
+    return PROXY_PREFIX + bytes.fromhex(implementation[2:]) + PROXY_SUFFIX
+
+
+def predict_clone_address(factory, implementation, salt):
+    # CREATE2: keccak256(0xff ++ factory ++ salt ++ keccak256(init_code))[12:]
+    digest = keccak(b'\xff' + bytes.fromhex(factory[2:]) + salt + keccak(proxy_init_code(implementation)))
+    return to_checksum_address(digest[12:])
+
+
+class CloneFactory:
+    def __init__(self, web3, solc_version, tx_sender=None):
+        self.web3 = web3
+        self.solc_version = solc_version
+        if tx_sender is None:
+            from transactions import TransactionSender
+            tx_sender = TransactionSender(web3)
+        self.tx_sender = tx_sender
+        self.contract = None
+        self.implementations = {}
+        self._lock = threading.RLock()
+
+    def _deploy(self, contract_interface, account_address, private_key):
+        Contract = self.web3.eth.contract(abi=contract_interface['abi'], bytecode=contract_interface['bin'])
+        return self.tx_sender.transact(Contract.constructor(), account_address, private_key)
+
+    def ensure_deployed(self, account_address, private_key):
+        with self._lock:
+            if self.contract is None:
+                contract_interface = compile_contract(CLONE_FACTORY_SOURCE, 'CloneFactory', self.solc_version)
+                tx_receipt = self._deploy(contract_interface, account_address, private_key)
+                self.contract = self.web3.eth.contract(
+                    address=tx_receipt.contractAddress,
+                    abi=contract_interface['abi']
+                )
+            return self.contract.address
+
+    def implementation(self, name, contract_interface, account_address, private_key):
+        # The full creation code is paid for once per contract, every later instance is a proxy
+        with self._lock:
+            if name not in self.implementations:
+                tx_receipt = self._deploy(contract_interface, account_address, private_key)
+                self.implementations[name] = tx_receipt.contractAddress
+            return self.implementations[name]
+
+    def predict_address(self, implementation, salt):
+        return predict_clone_address(self.contract.address, implementation, salt)
+
+    def clone(self, implementation, init_data, account_address, private_key, salt=None):
+        self.ensure_deployed(account_address, private_key)
+        if salt is None:
+            call = self.contract.functions.clone(implementation, init_data)
+        else:
+            call = self.contract.functions.cloneDeterministic(implementation, salt, init_data)
+        tx_receipt = self.tx_sender.transact(call, account_address, private_key)
+        created = decode_logs(self.contract, tx_receipt['logs'], ('CloneCreated',))
+        if not created:
+            raise RuntimeError(f"Clone transaction {tx_receipt['transactionHash'].to_0x_hex()} created no instance")
+        return created[0]['args']['instance'], tx_receipt
@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class DeploymentRegistry:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    @staticmethod
+    def key(chain_id, contract_name, bytecode):
+        bytecode_hash = hashlib.sha256(bytes.fromhex(bytecode.removeprefix('0x'))).hexdigest()
+        return f"{chain_id}:{contract_name}:{bytecode_hash}"
+
+    def _save(self):
+        # Write-then-rename so a crash mid-write never leaves a truncated registry
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def lookup(self, web3, chain_id, contract_name, bytecode, deployer=None):
+        key = self.key(chain_id, contract_name, bytecode)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or (deployer is not None and entry.get('deployer') != deployer):
+            return None
+        # A reset testnet or a wrong RPC leaves the address empty, that entry is dead
+        if not web3.eth.get_code(entry['address']):
+            with self._lock:
+                self._entries.pop(key, None)
+                self._save()
+            return None
+        return entry
+
+    def record(self, chain_id, contract_name, bytecode, address, block, abi, deployer=None, **metadata):
+        entry = {
+            'address': address,
+            'block': block,
+            'abi': abi,
+            'deployer': deployer,
+            'deployed_at': datetime.now().isoformat(timespec='seconds'),
+            **metadata
+        }
+        with self._lock:
+            self._entries[self.key(chain_id, contract_name, bytecode)] = entry
+            self._save()
+        return entry
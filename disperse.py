@@ -0,0 +1,182 @@
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from artifact_cache import compile_contract
+from nft_index import decode_logs
+
+DISPERSE_SOURCE = '''
+pragma solidity ^0.8.0;
+
+interface IToken {
+    function transfer(address to, uint256 amount) external returns (bool);
+    function transferFrom(address from, address to, uint256 amount) external returns (bool);
+}
+
+contract Disperse {
+    event TransferFailed(uint256 index, address recipient, uint256 value);
+
+    function disperseEther(address payable[] calldata recipients, uint256[] calldata values) external payable {
+        require(recipients.length == values.length, "Length mismatch");
+        uint256 refund = msg.value;
+        for (uint256 i = 0; i < recipients.length; i++) {
+            (bool sent, ) = recipients[i].call{value: values[i]}("");
+            if (sent) {
+                refund -= values[i];
+            } else {
+                emit TransferFailed(i, recipients[i], values[i]);
+            }
+        }
+        if (refund > 0) {
+            (bool refunded, ) = payable(msg.sender).call{value: refund}("");
+            require(refunded, "Refund failed");
+        }
+    }
+
+    function disperseToken(IToken token, address[] calldata recipients, uint256[] calldata values) external {
+        require(recipients.length == values.length, "Length mismatch");
+        uint256 total = 0;
+        for (uint256 i = 0; i < values.length; i++) {
+            total += values[i];
+        }
+        require(token.transferFrom(msg.sender, address(this), total), "transferFrom failed");
+
+        uint256 refund = 0;
+        for (uint256 i = 0; i < recipients.length; i++) {
+            try token.transfer(recipients[i], values[i]) returns (bool sent) {
+                if (!sent) {
+                    refund += values[i];
+                    emit TransferFailed(i, recipients[i], values[i]);
+                }
+            } catch {
+                refund += values[i];
+                emit TransferFailed(i, recipients[i], values[i]);
+            }
+        }
+        if (refund > 0) {
+            require(token.transfer(msg.sender, refund), "Refund failed");
+        }
+    }
+}
+'''
+
+
+@dataclass
+class PaymentResult:
+    recipient: str
+    amount: int
+    success: bool
+    tx_hash: Optional[str] = None
+    error: Optional[str] = None
+
+
+class Disperser:
+    def __init__(self, web3, solc_version, tx_sender=None, gas_fraction=0.5, initial_chunk=100):
+        self.web3 = web3
+        self.solc_version = solc_version
+        if tx_sender is None:
+            from transactions import TransactionSender
+            tx_sender = TransactionSender(web3)
+        self.tx_sender = tx_sender
+        self.gas_fraction = gas_fraction
+        self.initial_chunk = initial_chunk
+        self.contract = None
+        self._gas_budget = None
+        self._lock = threading.Lock()
+
+    def _interface(self):
+        return compile_contract(DISPERSE_SOURCE, 'Disperse', self.solc_version)
+
+    def attach(self, address):
+        self.contract = self.web3.eth.contract(
+            address=self.web3.to_checksum_address(address),
+            abi=self._interface()['abi']
+        )
+        return self.contract.address
+
+    def ensure_deployed(self, account_address, private_key):
+        with self._lock:
+            if self.contract is None:
+                contract_interface = self._interface()
+                Disperse = self.web3.eth.contract(
+                    abi=contract_interface['abi'],
+                    bytecode=contract_interface['bin']
+                )
+                tx_receipt = self.tx_sender.transact(Disperse.constructor(), account_address, private_key)
+                self.attach(tx_receipt.contractAddress)
+            return self.contract.address
+
+    def gas_budget(self):
+        # Leave room in the block for everyone else's transactions
+        if self._gas_budget is None:
+            self._gas_budget = int(self.web3.eth.get_block('latest')['gasLimit'] * self.gas_fraction)
+        return self._gas_budget
+
+    def chunk_size(self, call, remaining):
+        gas_profiles = self.tx_sender.gas_profiles
+        key = gas_profiles.profile_key(
+            call, {'to': self.contract.address, 'data': call._encode_transaction_data()}
+        )
+        limit = gas_profiles.max_units(key, self.gas_budget())
+        return min(remaining, limit or self.initial_chunk)
+
+    def _send_chunks(self, build_call, payments, from_address, private_key, native):
+        results = []
+        position = 0
+        while position < len(payments):
+            remaining = payments[position:]
+            size = self.chunk_size(build_call(remaining), len(remaining))
+            chunk = remaining[:size]
+            position += size
+            try:
+                receipt = self.tx_sender.transact(
+                    build_call(chunk), from_address, private_key, units=size,
+                    value=sum(amount for _, amount in chunk) if native else None
+                )
+            except Exception as e:
+                results.extend(PaymentResult(recipient, amount, False, error=str(e)) for recipient, amount in chunk)
+                continue
+
+            tx_hash = receipt['transactionHash'].to_0x_hex()
+            if receipt['status'] != 1:
+                results.extend(
+                    PaymentResult(recipient, amount, False, tx_hash, 'reverted') for recipient, amount in chunk
+                )
+                continue
+            failed = {
+                event['args']['index']
+                for event in decode_logs(self.contract, receipt['logs'], ('TransferFailed',))
+            }
+            results.extend(
+                PaymentResult(recipient, amount, index not in failed, tx_hash,
+                              'recipient rejected the transfer' if index in failed else None)
+                for index, (recipient, amount) in enumerate(chunk)
+            )
+        return results
+
+    def send_native(self, from_address, private_key, payments):
+        # Payments are (recipient, amount in wei) pairs, failed recipients are refunded by the contract
+        self.ensure_deployed(from_address, private_key)
+        return self._send_chunks(
+            lambda chunk: self.contract.functions.disperseEther(
+                [recipient for recipient, _ in chunk], [amount for _, amount in chunk]
+            ),
+            list(payments), from_address, private_key, native=True
+        )
+
+    def send_token(self, token_contract, from_address, private_key, payments):
+        self.ensure_deployed(from_address, private_key)
+        payments = list(payments)
+        # One approval covers every chunk of this distribution
+        total = sum(amount for _, amount in payments)
+        if token_contract.functions.allowance(from_address, self.contract.address).call() < total:
+            self.tx_sender.transact(
+                token_contract.functions.approve(self.contract.address, total),
+                from_address, private_key
+            )
+        return self._send_chunks(
+            lambda chunk: self.contract.functions.disperseToken(
+                token_contract.address, [recipient for recipient, _ in chunk], [amount for _, amount in chunk]
+            ),
+            payments, from_address, private_key, native=False
+        )
@@ -0,0 +1,276 @@
+import sqlite3
+import threading
+
+from nft_index import decode_logs
+
+INDEXED_EVENTS = ('Transfer', 'Mint', 'Burn')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS contracts (
+    address TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    checkpoint INTEGER NOT NULL,
+    chain_id INTEGER,
+    start_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    number INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    address TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    sender TEXT,
+    receiver TEXT,
+    amount TEXT NOT NULL,
+    PRIMARY KEY (address, block, log_index)
+);
+CREATE TABLE IF NOT EXISTS balances (
+    address TEXT NOT NULL,
+    account TEXT NOT NULL,
+    balance TEXT NOT NULL,
+    PRIMARY KEY (address, account)
+);
+CREATE TABLE IF NOT EXISTS owners (
+    address TEXT NOT NULL,
+    token_id TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    PRIMARY KEY (address, token_id)
+);
+CREATE INDEX IF NOT EXISTS owners_by_owner ON owners (address, owner);
+'''
+
+# Columns added after the first schema, older databases get them on open
+CONTRACT_COLUMNS = (('chain_id', 'INTEGER'), ('start_hash', 'TEXT'))
+
+
+class EventIndexer:
+    def __init__(self, web3, db_path, reorg_depth=12, chunk_size=2000, min_chunk=10, max_chunk=50000,
+                 target_logs=1000, poll_interval=5.0, chain_id=None):
+        self.web3 = web3
+        self.chain_id = chain_id
+        self.reorg_depth = reorg_depth
+        self.chunk_size = chunk_size
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.target_logs = target_logs
+        self.poll_interval = poll_interval
+        self.log_requests = 0
+        self.reorgs = 0
+        self.contracts = {}
+        # Amounts are uint256, SQLite integers stop at 2**63 so they are stored as decimal text
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute('PRAGMA table_info(contracts)')}
+        for column, column_type in CONTRACT_COLUMNS:
+            if column not in columns:
+                self.db.execute(f'ALTER TABLE contracts ADD COLUMN {column} {column_type}')
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, contract, kind, start_block=0):
+        # A reset chain hands the same deployer the same address again, so a contract is identified
+        # by its chain and the hash of its deploy block; anything else indexed at the address is dropped
+        address = contract.address
+        start_hash = self._block_hash(max(start_block, 0))
+        with self._lock, self.db:
+            row = self.db.execute(
+                'SELECT chain_id, start_hash FROM contracts WHERE address = ?', (address,)
+            ).fetchone()
+            if row != (self.chain_id, start_hash):
+                for table in ('events', 'balances', 'owners'):
+                    self.db.execute(f'DELETE FROM {table} WHERE address = ?', (address,))
+                self.db.execute(
+                    'INSERT OR REPLACE INTO contracts (address, kind, checkpoint, chain_id, start_hash) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (address, kind, start_block - 1, self.chain_id, start_hash)
+                )
+            self.contracts[address] = (kind, contract)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='event-indexer', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception:
+                # The checkpoint only moves on success, the next tick resumes where this one stopped
+                pass
+            self._stop.wait(self.poll_interval)
+
+    def sync(self):
+        with self._lock:
+            while True:
+                # The head is pinned before any logs are read, its hash is what later checks compare against
+                head = self.web3.eth.get_block('latest')
+                latest, head_hash = head['number'], head['hash'].hex()
+                self._check_reorg()
+                if all(self._sync_contract(address, kind, contract, latest, head_hash)
+                       for address, (kind, contract) in self.contracts.items()):
+                    self._remember_block(latest, head_hash)
+                    return latest
+
+    def _checkpoint(self, address):
+        row = self.db.execute('SELECT checkpoint FROM contracts WHERE address = ?', (address,)).fetchone()
+        return row[0] if row else None
+
+    def _sync_contract(self, address, kind, contract, latest, head_hash):
+        checkpoint = self._checkpoint(address)
+        while checkpoint < latest:
+            to_block = min(latest, checkpoint + self.chunk_size)
+            self.log_requests += 1
+            try:
+                logs = self.web3.eth.get_logs({'address': address, 'fromBlock': checkpoint + 1, 'toBlock': to_block})
+            except Exception:
+                # Providers cap block ranges and result counts differently, any failure shrinks the range
+                if self.chunk_size <= self.min_chunk:
+                    raise
+                self.chunk_size = max(self.min_chunk, self.chunk_size // 2)
+                continue
+
+            events = decode_logs(contract, logs, INDEXED_EVENTS)
+            if self._block_hash(latest) != head_hash:
+                # Reorged while the logs were read, nothing from this chunk is kept and sync starts over
+                return False
+            with self.db:
+                for event in events:
+                    self._store(address, kind, event)
+                self.db.execute('UPDATE contracts SET checkpoint = ? WHERE address = ?', (to_block, address))
+            checkpoint = to_block
+
+            if len(logs) < self.target_logs:
+                self.chunk_size = min(self.max_chunk, self.chunk_size * 2)
+        return True
+
+    def _store(self, address, kind, event):
+        args = event['args']
+        amount = args['value'] if 'value' in args else args['tokenId']
+        cursor = self.db.execute(
+            'INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (address, event['blockNumber'], event['logIndex'], event['transactionHash'].to_0x_hex(),
+             event['event'], args.get('from'), args.get('to'), str(amount))
+        )
+        if cursor.rowcount:
+            self._apply(address, kind, event['event'], args.get('from'), args.get('to'), amount)
+
+    def _apply(self, address, kind, event, sender, receiver, amount):
+        if kind == 'token':
+            if event in ('Transfer', 'Burn'):
+                self._add_balance(address, sender, -amount)
+            if event in ('Transfer', 'Mint'):
+                self._add_balance(address, receiver, amount)
+        elif event == 'Burn':
+            self.db.execute('DELETE FROM owners WHERE address = ? AND token_id = ?', (address, str(amount)))
+        else:
+            self.db.execute(
+                'INSERT OR REPLACE INTO owners (address, token_id, owner) VALUES (?, ?, ?)',
+                (address, str(amount), receiver)
+            )
+
+    def _add_balance(self, address, account, delta):
+        row = self.db.execute(
+            'SELECT balance FROM balances WHERE address = ? AND account = ?', (address, account)
+        ).fetchone()
+        balance = (int(row[0]) if row else 0) + delta
+        self.db.execute(
+            'INSERT OR REPLACE INTO balances (address, account, balance) VALUES (?, ?, ?)',
+            (address, account, str(balance))
+        )
+
+    def _block_hash(self, number):
+        from web3.exceptions import BlockNotFound
+        # Only a block the node no longer has counts as gone, other RPC errors fail the tick and it retries
+        try:
+            return self.web3.eth.get_block(number)['hash'].hex()
+        except BlockNotFound:
+            return None
+
+    def _remember_block(self, number, block_hash):
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)', (number, block_hash))
+            self.db.execute('DELETE FROM blocks WHERE number < ?', (number - self.reorg_depth,))
+
+    def _check_reorg(self):
+        rows = self.db.execute('SELECT number, hash FROM blocks ORDER BY number DESC').fetchall()
+        # Newest first, the common case is one matching hash and no further lookups
+        for position, (number, block_hash) in enumerate(rows):
+            if self._block_hash(number) == block_hash:
+                if position:
+                    self._rollback(number)
+                return
+        if rows:
+            self._rollback(rows[0][0] - self.reorg_depth)
+
+    def _rollback(self, fork_block):
+        # Near genesis the reorg window reaches below block 0
+        fork_block = max(fork_block, -1)
+        self.reorgs += 1
+        with self.db:
+            self.db.execute('DELETE FROM events WHERE block > ?', (fork_block,))
+            self.db.execute('DELETE FROM blocks WHERE number > ?', (fork_block,))
+            self.db.execute('UPDATE contracts SET checkpoint = ? WHERE checkpoint > ?', (fork_block, fork_block))
+            # Derived state is not reversible for NFTs, replaying the surviving events is simpler
+            self.db.execute('DELETE FROM balances')
+            self.db.execute('DELETE FROM owners')
+            kinds = dict(self.db.execute('SELECT address, kind FROM contracts').fetchall())
+            rows = self.db.execute(
+                'SELECT address, event, sender, receiver, amount FROM events ORDER BY address, block, log_index'
+            ).fetchall()
+            for address, event, sender, receiver, amount in rows:
+                self._apply(address, kinds.get(address), event, sender, receiver, int(amount))
+
+    def balance_of(self, address, account):
+        return self.balances_of(address, [account])[account]
+
+    def balances_of(self, address, accounts):
+        accounts = list(accounts)
+        rows = {}
+        with self._lock:
+            # Only the asked-for accounts are read, the table also holds every receiver ever paid
+            for start in range(0, len(accounts), 500):
+                chunk = accounts[start:start + 500]
+                rows.update(self.db.execute(
+                    f'SELECT account, balance FROM balances WHERE address = ? '
+                    f'AND account IN ({", ".join("?" * len(chunk))})',
+                    (address, *chunk)
+                ).fetchall())
+        return {account: int(rows.get(account, 0)) for account in accounts}
+
+    def owner_of(self, address, token_id):
+        with self._lock:
+            row = self.db.execute(
+                'SELECT owner FROM owners WHERE address = ? AND token_id = ?', (address, str(token_id))
+            ).fetchone()
+        return row[0] if row else None
+
+    def tokens_of(self, address, owner):
+        with self._lock:
+            rows = self.db.execute(
+                'SELECT token_id FROM owners WHERE address = ? AND owner = ?', (address, owner)
+            ).fetchall()
+        return [int(token_id) for token_id, in rows]
+
+    def owners(self, address):
+        with self._lock:
+            rows = self.db.execute('SELECT token_id, owner FROM owners WHERE address = ?', (address,)).fetchall()
+        return {int(token_id): owner for token_id, owner in rows}
+
+    def checkpoint(self, address):
+        with self._lock:
+            return self._checkpoint(address)
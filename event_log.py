@@ -0,0 +1,209 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from colorama import Fore, Style
+from metrics import current_operation
+
+LEVEL_STYLES = {
+    'ok': (Fore.GREEN, " " + Fore.GREEN + "✔️" + Style.RESET_ALL),
+    'info': (Fore.CYAN, ''),
+    'warning': (Fore.YELLOW, ''),
+    'error': (Fore.RED, " " + Fore.RED + "❌" + Style.RESET_ALL),
+}
+
+_STOP = object()
+
+
+def build_record(entry):
+    # Runs on the writer thread: receipts, exceptions and the message are only turned into text here
+    timestamp, level, message, operation, finished, fields = entry
+    record = {'time': round(timestamp, 3), 'level': level}
+    if operation is not None:
+        record['operation'] = operation[0]
+        record['latency'] = round(finished - operation[1], 6)
+    receipt = fields.pop('receipt', None)
+    if receipt is not None:
+        record['tx_hash'] = receipt['transactionHash'].to_0x_hex()
+        record['gas_used'] = receipt['gasUsed']
+        record['block'] = receipt['blockNumber']
+    error = fields.pop('error', None)
+    if error is not None:
+        record['error'] = str(error)
+        record['error_type'] = type(error).__name__
+    record.update(fields)
+    try:
+        record['message'] = message.format(**record)
+    except (KeyError, IndexError, ValueError):
+        record['message'] = message
+    return record
+
+
+class JSONLinesSink:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, default=str) + '\n')
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+
+class RotatingFileSink:
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        if self.max_bytes and self._file.tell() + len(line) > self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ConsoleSink:
+    # At most max_per_second lines, the rest is folded into one summary line per second
+    def __init__(self, max_per_second=0, stream=None):
+        self.max_per_second = max_per_second
+        self.stream = stream or sys.stdout
+        self._window = 0
+        self._shown = 0
+        self._suppressed = {}
+
+    def _summary(self):
+        counts = ', '.join(f"{count} {level}" for level, count in sorted(self._suppressed.items()))
+        self._suppressed.clear()
+        return Fore.CYAN + f"... {counts} event(s) not shown" + Style.RESET_ALL
+
+    def write(self, record):
+        if self.max_per_second:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window = window
+                self._shown = 0
+                if self._suppressed:
+                    self.stream.write(self._summary() + '\n')
+            if self._shown >= self.max_per_second:
+                self._suppressed[record['level']] = self._suppressed.get(record['level'], 0) + 1
+                return
+            self._shown += 1
+        color, mark = LEVEL_STYLES.get(record['level'], ('', ''))
+        self.stream.write(color + record['message'] + Style.RESET_ALL + mark + '\n')
+
+    def flush(self):
+        if self._suppressed:
+            self.stream.write(self._summary() + '\n')
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+
+class EventLog:
+    # emit() only enqueues, formatting and I/O happen on one background writer
+    def __init__(self, sinks=None, queue_size=10000):
+        self.sinks = sinks if sinks is not None else [ConsoleSink()]
+        self.dropped = 0
+        self._queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def configure(self, sinks, queue_size=None):
+        self.close()
+        self.sinks = sinks
+        if queue_size:
+            self._queue = queue.Queue(queue_size)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='event-log', daemon=True)
+                self._thread.start()
+
+    def emit(self, level, message, **fields):
+        if self._thread is None:
+            self.start()
+        entry = (time.time(), level, message, current_operation(), time.perf_counter(), fields)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # A slow terminal or disk must never hold up a send
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is _STOP:
+                    return
+                record = build_record(entry)
+                for sink in self.sinks:
+                    try:
+                        sink.write(record)
+                    except Exception:
+                        pass
+                if self._queue.empty():
+                    for sink in self.sinks:
+                        try:
+                            sink.flush()
+                        except Exception:
+                            pass
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join()
+        for sink in self.sinks:
+            sink.close()
+        if self.dropped:
+            sys.stdout.write(Fore.YELLOW + f"{self.dropped} log event(s) dropped, the queue was full\n")
+
+
+def build_sinks(console='color', console_rate=0, file_path='', max_bytes=10 * 1024 * 1024, backups=5):
+    sinks = []
+    if console == 'color':
+        sinks.append(ConsoleSink(console_rate))
+    elif console == 'json':
+        sinks.append(JSONLinesSink())
+    if file_path:
+        sinks.append(RotatingFileSink(file_path, max_bytes, backups))
+    return sinks
+
+
+EVENTS = EventLog()
+
+
+def log_event(level, message, **fields):
+    EVENTS.emit(level, message, **fields)
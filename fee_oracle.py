@@ -0,0 +1,42 @@
+import threading
+import time
+
+
+class FeeOracle:
+    def __init__(self, web3, ttl=3.0, eip1559=False, percentile=50, history_blocks=5):
+        self.web3 = web3
+        self.ttl = ttl
+        self.eip1559 = eip1559
+        self.percentile = percentile
+        self.history_blocks = history_blocks
+        self._fields = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def _legacy_fields(self):
+        return {'gasPrice': self.web3.eth.gas_price}
+
+    def _eip1559_fields(self):
+        history = self.web3.eth.fee_history(self.history_blocks, 'latest', [self.percentile])
+        # The last base fee in the history is the one for the next block
+        base_fee = history['baseFeePerGas'][-1]
+        rewards = sorted(reward[0] for reward in history.get('reward', []) if reward)
+        if rewards:
+            priority_fee = rewards[len(rewards) // 2]
+        else:
+            priority_fee = self.web3.eth.max_priority_fee
+        return {
+            'maxFeePerGas': 2 * base_fee + priority_fee,
+            'maxPriorityFeePerGas': priority_fee
+        }
+
+    def fee_fields(self):
+        with self._lock:
+            if self._fields is None or time.monotonic() - self._fetched_at >= self.ttl:
+                self._fields = self._eip1559_fields() if self.eip1559 else self._legacy_fields()
+                self._fetched_at = time.monotonic()
+            return dict(self._fields)
+
+    def invalidate(self):
+        with self._lock:
+            self._fields = None
@@ -0,0 +1,85 @@
+import hashlib
+import threading
+
+
+class GasProfileCache:
+    def __init__(self, web3, margin=1.2):
+        self.web3 = web3
+        self.margin = margin
+        self.estimates = 0
+        self._profiles = {}
+        self._code_hashes = {}
+        self._lock = threading.Lock()
+
+    def code_hash(self, address):
+        with self._lock:
+            if address in self._code_hashes:
+                return self._code_hashes[address]
+        code_hash = hashlib.sha256(bytes(self.web3.eth.get_code(address))).hexdigest()
+        with self._lock:
+            self._code_hashes[address] = code_hash
+        return code_hash
+
+    def profile_key(self, contract_call, transaction, units=None):
+        if not transaction.get('to'):
+            # Constructor arguments vary per deploy, only the creation code identifies it
+            return (hashlib.sha256(bytes(contract_call.bytecode)).hexdigest(), 'constructor')
+        key = (self.code_hash(transaction['to']), transaction['data'][:10])
+        # Batch calls scale with their item count, each count gets its own profile
+        return key + (units,) if units is not None else key
+
+    def _estimate(self, transaction):
+        call = {key: transaction[key] for key in ('from', 'to', 'data', 'value') if transaction.get(key)}
+        self.estimates += 1
+        return self.web3.eth.estimate_gas(call)
+
+    def gas_limit(self, key, transaction):
+        with self._lock:
+            profile = self._profiles.get(key)
+        if profile is None:
+            profile = {'estimate': self._estimate(transaction), 'observed': 0}
+            with self._lock:
+                self._profiles[key] = profile
+        return int(max(profile['estimate'], profile['observed']) * self.margin)
+
+    def record(self, key, receipt, gas_limit):
+        with self._lock:
+            # Reverts and out-of-gas runs force a fresh estimate next time
+            if receipt['status'] != 1 or receipt['gasUsed'] >= gas_limit:
+                self._profiles.pop(key, None)
+                return
+            profile = self._profiles.get(key)
+            if profile is not None:
+                profile['observed'] = max(profile['observed'], receipt['gasUsed'])
+
+    def max_units(self, key, gas_budget):
+        with self._lock:
+            points = sorted(
+                (profile_key[2], max(profile['estimate'], profile['observed']))
+                for profile_key, profile in self._profiles.items()
+                if len(profile_key) == 3 and profile_key[:2] == key
+            )
+        if not points:
+            return None
+        (low_units, low_gas), (high_units, high_gas) = points[0], points[-1]
+        if high_units > low_units and high_gas > low_gas:
+            # Two batch sizes give the fixed overhead and the cost of each extra item
+            per_unit = (high_gas - low_gas) / (high_units - low_units)
+            base = low_gas - per_unit * low_units
+        else:
+            # A single size charges the overhead to every item, which only underfills the batch
+            per_unit = high_gas / high_units
+            base = 0
+        return max(1, int((gas_budget / self.margin - base) // per_unit))
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._profiles.clear()
+                self._code_hashes.clear()
+            else:
+                self._profiles.pop(key, None)
+
+    def profiles(self):
+        with self._lock:
+            return {key: dict(profile) for key, profile in self._profiles.items()}
@@ -1,13 +1,36 @@
-from web3 import Web3
 import time
+STARTUP_BEGIN = time.perf_counter()
+
+import argparse
+import asyncio
 import os
 import secrets
 import random
-from eth_account import Account
 from dotenv import load_dotenv
 from datetime import datetime
 from colorama import Fore, Style, init
-from solcx import install_solc, set_solc_version, compile_source
+from account_sources import load_all_accounts
+from artifact_cache import artifact_cache, compile_contract
+from async_engine import AsyncEngine
+from balance_ledger import NATIVE, TOKEN, BalanceLedger
+from batch_reads import BatchReader
+from clone_factory import CLONE_FACTORY_SOURCE, CloneFactory
+from deployment_registry import DeploymentRegistry
+from disperse import DISPERSE_SOURCE, Disperser
+from event_indexer import EventIndexer
+from event_log import EVENTS, build_sinks, log_event
+from metrics import metrics_middleware, start_http_server, start_snapshots, timed, write_snapshot
+from fee_oracle import FeeOracle
+from gas_profiles import GasProfileCache
+from multicall import MULTICALL3_ADDRESS, MULTICALL_SOURCE, Multicall
+from nft_index import NFTOwnershipIndex
+from nonce_manager import NonceManager
+from rate_scheduler import RateScheduler, parse_weights
+from receipt_tracker import ReceiptTracker
+from receiver_pool import ReceiverPool, random_address
+from signing_pipeline import SigningPipeline
+from transactions import TransactionSender
+from tx_watchdog import StuckTransactionWatchdog
 
 # Initialize Colorama
 init(autoreset=True)
@@ -22,14 +45,96 @@ TOKEN_SYMBOL = Fore.MAGENTA + "DEZ" + Style.RESET_ALL
 # Load Environment Variables
 load_dotenv()
 
-# Solidity Configuration
-install_solc('0.8.19')
-set_solc_version('0.8.19')
+# Solidity Configuration (solc is only resolved on an artifact cache miss)
+SOLC_VERSION = '0.8.19'
 
 # Blockchain Configuration
 RPC_URL = os.getenv('RPC_URL', "https://zenchain-testnet.api.onfinality.io/public")
-CHAIN_ID = 8408
-web3 = Web3(Web3.HTTPProvider(RPC_URL))
+RPC_URLS = os.getenv('RPC_URLS', '')  # Comma-separated endpoint pool, overrides RPC_URL
+RPC_WRITE_URL = os.getenv('RPC_WRITE_URL', '')  # Preferred endpoint for sends, defaults to the first
+RPC_POOL_SIZE = int(os.getenv('RPC_POOL_SIZE', 20))
+RPC_BATCH_SIZE = int(os.getenv('RPC_BATCH_SIZE', 100))
+MULTICALL_ADDRESS = os.getenv('MULTICALL_ADDRESS', MULTICALL3_ADDRESS)  # Deployed fresh when nothing is there
+MULTICALL_BATCH_SIZE = int(os.getenv('MULTICALL_BATCH_SIZE', 500))
+CHAIN_ID = int(os.getenv('CHAIN_ID', 8408))
+
+# Fee Configuration: FEE_MODE is 'legacy' (gasPrice) or 'eip1559' (eth_feeHistory)
+FEE_MODE = os.getenv('FEE_MODE', 'legacy')
+FEE_PERCENTILE = float(os.getenv('FEE_PERCENTILE', 50))
+FEE_TTL = float(os.getenv('FEE_TTL', 3))
+
+# Gas Configuration: limits come from estimate/observed gasUsed times this margin
+GAS_MARGIN = float(os.getenv('GAS_MARGIN', 1.2))
+
+# Receipt Configuration: one block-following tracker resolves every pending hash
+RECEIPT_POLL_INTERVAL = float(os.getenv('RECEIPT_POLL_INTERVAL', 1))
+RECEIPT_TIMEOUT = float(os.getenv('RECEIPT_TIMEOUT', 120))
+
+# Signing Configuration: SIGNER_WORKERS > 0 signs in a process pool (only pays off with --async), 0 signs inline
+SIGNER_WORKERS = int(os.getenv('SIGNER_WORKERS', 0))
+SIGNER_QUEUE_SIZE = int(os.getenv('SIGNER_QUEUE_SIZE', 64))
+
+# Account Sources: ACCOUNT_ADDRESS_n/PRIVATE_KEY_n, plus an optional keystore directory and BIP-44 mnemonic range
+ACCOUNT_KEYSTORE_DIR = os.getenv('ACCOUNT_KEYSTORE_DIR', '')
+KEYSTORE_PASSWORD = os.getenv('KEYSTORE_PASSWORD', '')
+ACCOUNT_MNEMONIC = os.getenv('ACCOUNT_MNEMONIC', '')
+MNEMONIC_START = int(os.getenv('MNEMONIC_START', 0))
+MNEMONIC_COUNT = int(os.getenv('MNEMONIC_COUNT', 0))
+ACCOUNT_LOADER_WORKERS = int(os.getenv('ACCOUNT_LOADER_WORKERS', 0))  # 0 uses every core
+
+# Indexer Configuration: Transfer/Mint/Burn logs mirrored into SQLite, empty INDEXER_DB disables it
+INDEXER_DB = os.getenv('INDEXER_DB', 'events.db')
+INDEXER_REORG_DEPTH = int(os.getenv('INDEXER_REORG_DEPTH', 12))
+INDEXER_CHUNK_SIZE = int(os.getenv('INDEXER_CHUNK_SIZE', 2000))
+INDEXER_POLL_INTERVAL = float(os.getenv('INDEXER_POLL_INTERVAL', 5))
+
+# NFT Batch Configuration: gas ceiling for one mintBatch/transferBatch/burnBatch transaction
+NFT_BATCH_GAS_BUDGET = int(os.getenv('NFT_BATCH_GAS_BUDGET', 3000000))
+
+# Fan-out Configuration: above 1, ZCX and DEZ sends go to this many receivers through the Disperse contract
+FANOUT_RECIPIENTS = int(os.getenv('FANOUT_RECIPIENTS', 1))
+
+# Deployment Registry: token and NFT contracts are reused across restarts, empty disables it
+DEPLOYMENT_REGISTRY = os.getenv('DEPLOYMENT_REGISTRY', 'deployments.json')
+
+# Storage Deploy Configuration: 'full', 'clone' (EIP-1167 proxy) or 'create2' (proxy at a precomputable address)
+STORAGE_MODE = os.getenv('STORAGE_MODE', 'full')
+
+# Receiver Configuration: addresses are pre-generated into a bounded pool, or streamed from a file (one per line)
+RECEIVER_POOL_SIZE = int(os.getenv('RECEIVER_POOL_SIZE', 1000))
+RECEIVER_FILE = os.getenv('RECEIVER_FILE', '')
+
+# Stuck Transaction Configuration: seconds before an unmined nonce is re-sent with higher fees (0 = off),
+# bump per replacement in percent, replacements per nonce and the fee ceiling in gwei (0 = no ceiling)
+STUCK_AFTER = float(os.getenv('STUCK_AFTER', 45))
+FEE_BUMP_PERCENT = float(os.getenv('FEE_BUMP_PERCENT', 15))
+MAX_FEE_BUMPS = int(os.getenv('MAX_FEE_BUMPS', 5))
+MAX_FEE_GWEI = float(os.getenv('MAX_FEE_GWEI', 0))
+
+# Ledger Configuration: local balances are re-read from the chain after this many blocks (and after any revert)
+LEDGER_RECHECK_BLOCKS = int(os.getenv('LEDGER_RECHECK_BLOCKS', 50))
+
+# Rate Configuration: global and per-account token buckets (0 = unlimited) and the weighted operation mix
+TARGET_TPS = float(os.getenv('TARGET_TPS', 1))
+RATE_BURST = int(os.getenv('RATE_BURST', 2))
+ACCOUNT_TPS = float(os.getenv('ACCOUNT_TPS', 0.5))
+ACCOUNT_BURST = int(os.getenv('ACCOUNT_BURST', 1))
+OPERATION_WEIGHTS = os.getenv('OPERATION_WEIGHTS', '')
+
+# Metrics Configuration: Prometheus endpoint port (0 disables) and periodic JSON snapshot file (empty disables)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+METRICS_SNAPSHOT = os.getenv('METRICS_SNAPSHOT', '')
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv('METRICS_SNAPSHOT_INTERVAL', 60))
+
+# Log Configuration: console sink 'color', 'json' or 'off' (color lines per second, 0 = unlimited),
+# optional rotating JSON lines file, and the bounded queue in front of the background writer
+LOG_CONSOLE = os.getenv('LOG_CONSOLE', 'color')
+LOG_CONSOLE_RATE = int(os.getenv('LOG_CONSOLE_RATE', 20))
+LOG_FILE = os.getenv('LOG_FILE', '')
+LOG_FILE_MAX_BYTES = int(os.getenv('LOG_FILE_MAX_BYTES', 10 * 1024 * 1024))
+LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', 5))
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
 
 # Smart Contract Sources
 SIMPLE_STORAGE_SOURCE = '''
@@ -38,10 +143,17 @@ pragma solidity ^0.8.19;
 contract SimpleStorage {
     uint256 private storedData;
     address public owner;
+    bool private initialized;
 
     constructor() {
+        initialize(msg.sender);
+    }
+
+    function initialize(address _owner) public {
+        require(!initialized, "Already initialized");
+        initialized = true;
         storedData = 100;
-        owner = msg.sender;
+        owner = _owner;
     }
 
     function set(uint256 x) public {
@@ -65,10 +177,12 @@ contract DezToken {
     address public owner;
     
     mapping(address => uint256) private balances;
+    mapping(address => mapping(address => uint256)) private allowances;
     
     event Transfer(address indexed from, address indexed to, uint256 value);
     event Burn(address indexed from, uint256 value);
     event Mint(address indexed to, uint256 value);
+    event Approval(address indexed holder, address indexed spender, uint256 value);
 
     constructor(string memory _name, string memory _symbol, uint256 initialSupply) {
         name = _name;
@@ -89,6 +203,26 @@ contract DezToken {
         return true;
     }
     
+    function allowance(address holder, address spender) public view returns (uint256) {
+        return allowances[holder][spender];
+    }
+    
+    function approve(address spender, uint256 amount) public returns (bool) {
+        allowances[msg.sender][spender] = amount;
+        emit Approval(msg.sender, spender, amount);
+        return true;
+    }
+    
+    function transferFrom(address from, address to, uint256 amount) public returns (bool) {
+        require(allowances[from][msg.sender] >= amount, "Insufficient allowance");
+        require(balances[from] >= amount, "Insufficient balance");
+        allowances[from][msg.sender] -= amount;
+        balances[from] -= amount;
+        balances[to] += amount;
+        emit Transfer(from, to, amount);
+        return true;
+    }
+    
     function burn(uint256 amount) public returns (bool) {
         require(balances[msg.sender] >= amount, "Insufficient balance");
         balances[msg.sender] -= amount;
@@ -112,16 +246,37 @@ contract DezToken {
 '''
 
 class TokenManager:
-    def __init__(self, web3):
+    def __init__(self, web3, tx_sender=None, multicall=None, indexer=None, disperser=None, registry=None):
         self.web3 = web3
+        self.tx_sender = tx_sender or TransactionSender(web3)
+        self.multicall = multicall or Multicall(web3, SOLC_VERSION, self.tx_sender)
+        self.indexer = indexer
+        self.disperser = disperser or Disperser(web3, SOLC_VERSION, self.tx_sender)
+        self.registry = registry
         self.token_contract = None
         self.token_address = None
         self.random_suffix = ''.join(random.choices('0123456789ABCDEF', k=4))
 
+    def attach_token(self, address, abi, deploy_block):
+        self.token_address = address
+        self.token_contract = self.web3.eth.contract(address=address, abi=abi)
+        if self.tx_sender.ledger is not None:
+            self.tx_sender.ledger.attach_token(self.token_contract)
+        if self.indexer is not None:
+            self.indexer.watch(self.token_contract, 'token', deploy_block)
+
+    @timed('token.deploy')
     def deploy_token(self, account_address, private_key):
         try:
-            compiled_sol = compile_source(TOKEN_CONTRACT_SOURCE)
-            contract_interface = compiled_sol['<stdin>:DezToken']
+            contract_interface = compile_contract(TOKEN_CONTRACT_SOURCE, 'DezToken', SOLC_VERSION)
+
+            if self.registry is not None:
+                entry = self.registry.lookup(self.web3, CHAIN_ID, 'DezToken', contract_interface['bin'], account_address)
+                if entry is not None:
+                    self.attach_token(entry['address'], entry['abi'], entry['block'])
+                    log_event('ok', "Token {name} ({symbol}) reused at {token}", account=account_address,
+                              name=entry['name'], symbol=entry['symbol'], token=self.token_address)
+                    return True
             
             token_name = f"Dez {self.random_suffix}"
             token_symbol = f"DEZ{self.random_suffix}"
@@ -132,112 +287,128 @@ class TokenManager:
                 bytecode=contract_interface['bin']
             )
 
-            transaction = DezToken.constructor(token_name, token_symbol, initial_supply).build_transaction({
-                'from': account_address,
-                'nonce': self.web3.eth.get_transaction_count(account_address),
-                'gas': 3000000,
-                'gasPrice': self.web3.eth.gas_price
-            })
-
-            signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            self.token_address = tx_receipt.contractAddress
-            self.token_contract = self.web3.eth.contract(
-                address=self.token_address,
-                abi=contract_interface['abi']
+            tx_receipt = self.tx_sender.transact(
+                DezToken.constructor(token_name, token_symbol, initial_supply),
+                account_address, private_key
             )
 
-            print(Fore.GREEN + f"Token {token_name} ({token_symbol}) deployed at {self.token_address} {CHECK_MARK}")
+            self.attach_token(tx_receipt.contractAddress, contract_interface['abi'], tx_receipt.blockNumber)
+            if self.registry is not None:
+                self.registry.record(
+                    CHAIN_ID, 'DezToken', contract_interface['bin'], self.token_address, tx_receipt.blockNumber,
+                    contract_interface['abi'], account_address, name=token_name, symbol=token_symbol
+                )
+
+            log_event('ok', "Token {name} ({symbol}) deployed at {token}", account=account_address,
+                      name=token_name, symbol=token_symbol, token=self.token_address, receipt=tx_receipt)
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Failed to deploy token: {str(e)} {CROSS_MARK}")
+            log_event('error', "Failed to deploy token: {error}", account=account_address, error=e)
             return False
 
+    def balances_of(self, addresses):
+        if self.indexer is not None:
+            return self.indexer.balances_of(self.token_address, addresses)
+        balances = self.multicall.aggregate([
+            self.token_contract.functions.balanceOf(address) for address in addresses
+        ])
+        return dict(zip(addresses, balances))
+
+    def balance_for(self, address):
+        # The ledger answers from our own receipts, only an unknown or stale account costs a read
+        ledger = self.tx_sender.ledger
+        balance = ledger.token_balance(address) if ledger is not None else None
+        if balance is None:
+            balance = self.balances_of([address])[address]
+            if ledger is not None:
+                ledger.seed(TOKEN, {address: balance})
+        return balance
+
+    def total_supply(self):
+        return self.multicall.aggregate([self.token_contract.functions.totalSupply()])[0]
+
+    @timed('token.transfer')
     def transfer_random_amount(self, from_address, private_key, to_address):
         try:
-            balance = self.token_contract.functions.balanceOf(from_address).call()
+            balance = self.balance_for(from_address)
             if balance == 0:
-                print(Fore.YELLOW + "No tokens available to transfer")
+                log_event('warning', "No tokens available to transfer", account=from_address)
                 return False
 
             random_amount = random.randint(1, min(balance, 100 * 10**18))
             
-            transaction = self.token_contract.functions.transfer(
-                to_address,
-                random_amount
-            ).build_transaction({
-                'from': from_address,
-                'nonce': self.web3.eth.get_transaction_count(from_address),
-                'gas': 200000,
-                'gasPrice': self.web3.eth.gas_price
-            })
-
-            signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            print(Fore.GREEN + f"Random amount of tokens transferred to {to_address} {CHECK_MARK}")
+            receipt = self.tx_sender.transact(
+                self.token_contract.functions.transfer(to_address, random_amount),
+                from_address, private_key
+            )
+
+            log_event('ok', "Random amount of tokens transferred to {to}", account=from_address,
+                      to=to_address, amount=random_amount, receipt=receipt)
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Failed to transfer tokens: {str(e)} {CROSS_MARK}")
+            log_event('error', "Failed to transfer tokens: {error}", account=from_address, error=e)
+            return False
+
+    @timed('token.disperse')
+    def disperse_random_amounts(self, from_address, private_key, to_addresses):
+        try:
+            balance = self.balance_for(from_address)
+            if balance < len(to_addresses):
+                log_event('warning', "No tokens available to disperse", account=from_address)
+                return False
+
+            share = min(balance // len(to_addresses), 100 * 10**18)
+            results = self.disperser.send_token(
+                self.token_contract, from_address, private_key,
+                [(to_address, random.randint(1, share)) for to_address in to_addresses]
+            )
+
+            return report_payments(results, "tokens", from_address)
+
+        except Exception as e:
+            log_event('error', "Failed to disperse tokens: {error}", account=from_address, error=e)
             return False
 
+    @timed('token.burn')
     def burn_random_amount(self, from_address, private_key):
         try:
-            balance = self.token_contract.functions.balanceOf(from_address).call()
+            balance = self.balance_for(from_address)
             if balance == 0:
-                print(Fore.YELLOW + "No tokens available to burn")
+                log_event('warning', "No tokens available to burn", account=from_address)
                 return False
 
             random_amount = random.randint(1, min(balance, 50 * 10**18))
             
-            transaction = self.token_contract.functions.burn(
-                random_amount
-            ).build_transaction({
-                'from': from_address,
-                'nonce': self.web3.eth.get_transaction_count(from_address),
-                'gas': 200000,
-                'gasPrice': self.web3.eth.gas_price
-            })
-
-            signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            print(Fore.GREEN + f"Random amount of tokens burned {CHECK_MARK}")
+            receipt = self.tx_sender.transact(
+                self.token_contract.functions.burn(random_amount),
+                from_address, private_key
+            )
+
+            log_event('ok', "Random amount of tokens burned", account=from_address, amount=random_amount, receipt=receipt)
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Failed to burn tokens: {str(e)} {CROSS_MARK}")
+            log_event('error', "Failed to burn tokens: {error}", account=from_address, error=e)
             return False
 
+    @timed('token.mint')
     def mint_random_amount(self, owner_address, private_key, to_address):
         try:
             random_amount = random.randint(1, 100) * 10**18
             
-            transaction = self.token_contract.functions.mint(
-                to_address,
-                random_amount
-            ).build_transaction({
-                'from': owner_address,
-                'nonce': self.web3.eth.get_transaction_count(owner_address),
-                'gas': 200000,
-                'gasPrice': self.web3.eth.gas_price
-            })
-
-            signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            print(Fore.GREEN + f"Random amount of tokens minted to {to_address} {CHECK_MARK}")
+            receipt = self.tx_sender.transact(
+                self.token_contract.functions.mint(to_address, random_amount),
+                owner_address, private_key
+            )
+
+            log_event('ok', "Random amount of tokens minted to {to}", account=owner_address,
+                      to=to_address, amount=random_amount, receipt=receipt)
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Failed to mint tokens: {str(e)} {CROSS_MARK}")
+            log_event('error', "Failed to mint tokens: {error}", account=owner_address, error=e)
             return False
             # Part 2: NFT functionality and main execution logic
 
@@ -259,6 +430,7 @@ contract DezNFT {
     mapping(address => uint256) public balances;
     uint256 public totalSupply;
     uint256 public maxSupply;
+    uint256 public nextTokenId;
     
     event Transfer(address indexed from, address indexed to, uint256 tokenId);
     event Mint(address indexed to, uint256 tokenId);
@@ -276,7 +448,8 @@ contract DezNFT {
         require(totalSupply < maxSupply, "Max supply reached");
         
         totalSupply++;
-        uint256 tokenId = totalSupply;
+        nextTokenId++;
+        uint256 tokenId = nextTokenId;
         
         nfts[tokenId] = NFT(tokenId, to, true);
         balances[to]++;
@@ -307,6 +480,49 @@ contract DezNFT {
         emit Transfer(msg.sender, to, tokenId);
     }
     
+    function mintBatch(address to, uint256 count) public returns (uint256) {
+        require(msg.sender == owner, "Only owner can mint");
+        require(totalSupply + count <= maxSupply, "Max supply reached");
+        
+        uint256 tokenId = nextTokenId;
+        for (uint256 i = 0; i < count; i++) {
+            tokenId++;
+            nfts[tokenId] = NFT(tokenId, to, true);
+            emit Mint(to, tokenId);
+        }
+        
+        nextTokenId = tokenId;
+        totalSupply += count;
+        balances[to] += count;
+        return tokenId;
+    }
+    
+    function burnBatch(uint256[] calldata tokenIds) public {
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            require(nfts[tokenIds[i]].exists, "Token does not exist");
+            require(nfts[tokenIds[i]].owner == msg.sender, "Not token owner");
+            
+            delete nfts[tokenIds[i]];
+            emit Burn(msg.sender, tokenIds[i]);
+        }
+        
+        balances[msg.sender] -= tokenIds.length;
+        totalSupply -= tokenIds.length;
+    }
+    
+    function transferBatch(address to, uint256[] calldata tokenIds) public {
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            require(nfts[tokenIds[i]].exists, "Token does not exist");
+            require(nfts[tokenIds[i]].owner == msg.sender, "Not token owner");
+            
+            nfts[tokenIds[i]].owner = to;
+            emit Transfer(msg.sender, to, tokenIds[i]);
+        }
+        
+        balances[msg.sender] -= tokenIds.length;
+        balances[to] += tokenIds.length;
+    }
+    
     function balanceOf(address account) public view returns (uint256) {
         return balances[account];
     }
@@ -319,17 +535,43 @@ contract DezNFT {
 '''
 
 class NFTManager:
-    def __init__(self, web3):
+    def __init__(self, web3, tx_sender=None, multicall=None, indexer=None, batch_gas_budget=NFT_BATCH_GAS_BUDGET,
+                 registry=None):
         self.web3 = web3
+        self.tx_sender = tx_sender or TransactionSender(web3)
+        self.multicall = multicall or Multicall(web3, SOLC_VERSION, self.tx_sender)
+        self.indexer = indexer
+        self.batch_gas_budget = batch_gas_budget
+        self.registry = registry
         self.nft_contract = None
         self.nft_address = None
         self.random_suffix = ''.join(random.choices('0123456789ABCDEF', k=4))
-        self.owned_tokens = {}  # Track owned tokens for each address
-
+        self.ownership = NFTOwnershipIndex()  # Token ownership, fed by Mint/Transfer/Burn events
+
+    def attach_nft(self, address, abi, deploy_block):
+        self.nft_address = address
+        self.nft_contract = self.web3.eth.contract(address=address, abi=abi)
+        if self.indexer is not None:
+            # The local index already holds every owner, only blocks since its checkpoint are fetched
+            self.indexer.watch(self.nft_contract, 'nft', deploy_block)
+            self.indexer.sync()
+            self.ownership.load(self.indexer.owners(address))
+        else:
+            self.ownership.rebuild(self.nft_contract, deploy_block)
+
+    @timed('nft.deploy')
     def deploy_nft(self, account_address, private_key):
         try:
-            compiled_sol = compile_source(NFT_CONTRACT_SOURCE)
-            contract_interface = compiled_sol['<stdin>:DezNFT']
+            contract_interface = compile_contract(NFT_CONTRACT_SOURCE, 'DezNFT', SOLC_VERSION)
+
+            if self.registry is not None:
+                entry = self.registry.lookup(self.web3, CHAIN_ID, 'DezNFT', contract_interface['bin'], account_address)
+                if entry is not None:
+                    self.attach_nft(entry['address'], entry['abi'], entry['block'])
+                    log_event('ok', "NFT Collection {name} ({symbol}) reused at {nft} with {tokens} tokens",
+                              account=account_address, name=entry['name'], symbol=entry['symbol'],
+                              nft=self.nft_address, tokens=self.ownership.total())
+                    return True
             
             nft_name = f"Dez NFT {self.random_suffix}"
             nft_symbol = f"DNFT{self.random_suffix}"
@@ -340,255 +582,502 @@ class NFTManager:
                 bytecode=contract_interface['bin']
             )
 
-            transaction = DezNFT.constructor(nft_name, nft_symbol, max_supply).build_transaction({
-                'from': account_address,
-                'nonce': self.web3.eth.get_transaction_count(account_address),
-                'gas': 3000000,
-                'gasPrice': self.web3.eth.gas_price
-            })
-
-            signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            self.nft_address = tx_receipt.contractAddress
-            self.nft_contract = self.web3.eth.contract(
-                address=self.nft_address,
-                abi=contract_interface['abi']
+            tx_receipt = self.tx_sender.transact(
+                DezNFT.constructor(nft_name, nft_symbol, max_supply),
+                account_address, private_key
             )
 
-            print(Fore.GREEN + f"NFT Collection {nft_name} ({nft_symbol}) deployed at {self.nft_address} {CHECK_MARK}")
+            self.attach_nft(tx_receipt.contractAddress, contract_interface['abi'], tx_receipt.blockNumber)
+            if self.registry is not None:
+                self.registry.record(
+                    CHAIN_ID, 'DezNFT', contract_interface['bin'], self.nft_address, tx_receipt.blockNumber,
+                    contract_interface['abi'], account_address, name=nft_name, symbol=nft_symbol
+                )
+
+            log_event('ok', "NFT Collection {name} ({symbol}) deployed at {nft}", account=account_address,
+                      name=nft_name, symbol=nft_symbol, nft=self.nft_address, receipt=tx_receipt)
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Failed to deploy NFT collection: {str(e)} {CROSS_MARK}")
+            log_event('error', "Failed to deploy NFT collection: {error}", account=account_address, error=e)
             return False
 
+    def supply(self):
+        total_supply, max_supply = self.multicall.aggregate([
+            self.nft_contract.functions.totalSupply(),
+            self.nft_contract.functions.maxSupply()
+        ])
+        return total_supply, max_supply
+
+    def balances_of(self, addresses):
+        if self.indexer is not None:
+            return {address: len(self.indexer.tokens_of(self.nft_address, address)) for address in addresses}
+        balances = self.multicall.aggregate([
+            self.nft_contract.functions.balanceOf(address) for address in addresses
+        ])
+        return dict(zip(addresses, balances))
+
+    def owners_of(self, token_ids):
+        if self.indexer is not None:
+            return {token_id: self.indexer.owner_of(self.nft_address, token_id) for token_id in token_ids}
+        # ownerOf reverts for burned or unminted ids, those map to None
+        owners = self.multicall.aggregate(
+            [self.nft_contract.functions.ownerOf(token_id) for token_id in token_ids],
+            allow_failure=True
+        )
+        return dict(zip(token_ids, owners))
+
+    def batch_size(self, batch_call, requested):
+        # Earlier runs of this batch call tell how many items fit under the gas budget
+        gas_profiles = self.tx_sender.gas_profiles
+        key = gas_profiles.profile_key(
+            batch_call, {'to': self.nft_address, 'data': batch_call._encode_transaction_data()}
+        )
+        limit = gas_profiles.max_units(key, self.batch_gas_budget)
+        return requested if limit is None else min(requested, limit)
+
+    def _send_batches(self, build_call, items, from_address, private_key, event_name):
+        token_ids = []
+        position = 0
+        while position < len(items):
+            remaining = items[position:]
+            size = self.batch_size(build_call(remaining), len(remaining))
+            receipt = self.tx_sender.transact(
+                build_call(remaining[:size]),
+                from_address, private_key, units=size
+            )
+            token_ids.extend(
+                event['args']['tokenId']
+                for event in self.ownership.apply_receipt(self.nft_contract, receipt)
+                if event['event'] == event_name
+            )
+            position += size
+        return token_ids
+
+    def mint_batch(self, owner_address, private_key, to_address, count):
+        return self._send_batches(
+            lambda chunk: self.nft_contract.functions.mintBatch(to_address, len(chunk)),
+            list(range(count)), owner_address, private_key, 'Mint'
+        )
+
+    def transfer_batch(self, from_address, private_key, to_address, token_ids):
+        return self._send_batches(
+            lambda chunk: self.nft_contract.functions.transferBatch(to_address, chunk),
+            list(token_ids), from_address, private_key, 'Transfer'
+        )
+
+    def burn_batch(self, from_address, private_key, token_ids):
+        return self._send_batches(
+            lambda chunk: self.nft_contract.functions.burnBatch(chunk),
+            list(token_ids), from_address, private_key, 'Burn'
+        )
+
+    @timed('nft.mint')
     def mint_random_nfts(self, owner_address, private_key, to_address):
         try:
-            current_supply = self.nft_contract.functions.totalSupply().call()
-            max_supply = self.nft_contract.functions.maxSupply().call()
+            current_supply, max_supply = self.supply()
             
             if current_supply >= max_supply:
-                print(Fore.YELLOW + "Maximum supply reached")
+                log_event('warning', "Maximum supply reached", account=owner_address)
                 return False
 
             mint_count = random.randint(1, min(5, max_supply - current_supply))
-            minted_tokens = []
-
-            for _ in range(mint_count):
-                transaction = self.nft_contract.functions.mint(
-                    to_address
-                ).build_transaction({
-                    'from': owner_address,
-                    'nonce': self.web3.eth.get_transaction_count(owner_address),
-                    'gas': 200000,
-                    'gasPrice': self.web3.eth.gas_price
-                })
-
-                signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-                
-                # Track minted token
-                token_id = current_supply + len(minted_tokens) + 1
-                minted_tokens.append(token_id)
-                if to_address not in self.owned_tokens:
-                    self.owned_tokens[to_address] = []
-                self.owned_tokens[to_address].append(token_id)
-
-            print(Fore.GREEN + f"Minted {mint_count} NFTs to {to_address} {CHECK_MARK}")
+
+            # Minted ids come from the Mint events
+            minted_tokens = self.mint_batch(owner_address, private_key, to_address, mint_count)
+
+            log_event('ok', "Minted {count} NFTs to {to}", account=owner_address, to=to_address, count=len(minted_tokens))
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Failed to mint NFTs: {str(e)} {CROSS_MARK}")
+            log_event('error', "Failed to mint NFTs: {error}", account=owner_address, error=e)
             return False
 
+    @timed('nft.transfer')
     def transfer_random_nfts(self, from_address, private_key, to_address):
         try:
-            if from_address not in self.owned_tokens or not self.owned_tokens[from_address]:
-                print(Fore.YELLOW + "No NFTs available to transfer")
+            available = self.ownership.count(from_address)
+            if not available:
+                log_event('warning', "No NFTs available to transfer", account=from_address)
                 return False
 
-            transfer_count = random.randint(1, min(3, len(self.owned_tokens[from_address])))
-            tokens_to_transfer = random.sample(self.owned_tokens[from_address], transfer_count)
-
-            for token_id in tokens_to_transfer:
-                transaction = self.nft_contract.functions.transfer(
-                    to_address,
-                    token_id
-                ).build_transaction({
-                    'from': from_address,
-                    'nonce': self.web3.eth.get_transaction_count(from_address),
-                    'gas': 200000,
-                    'gasPrice': self.web3.eth.gas_price
-                })
-
-                signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-                # Update tracking
-                self.owned_tokens[from_address].remove(token_id)
-                if to_address not in self.owned_tokens:
-                    self.owned_tokens[to_address] = []
-                self.owned_tokens[to_address].append(token_id)
-
-            print(Fore.GREEN + f"Transferred {transfer_count} NFTs to {to_address} {CHECK_MARK}")
+            tokens_to_transfer = self.ownership.pick(from_address, random.randint(1, min(3, available)))
+            if not tokens_to_transfer:
+                log_event('warning', "No NFTs available to transfer", account=from_address)
+                return False
+            try:
+                transferred = self.transfer_batch(from_address, private_key, to_address, tokens_to_transfer)
+            finally:
+                self.ownership.release(tokens_to_transfer)
+
+            log_event('ok', "Transferred {count} NFTs to {to}", account=from_address, to=to_address, count=len(transferred))
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Failed to transfer NFTs: {str(e)} {CROSS_MARK}")
+            log_event('error', "Failed to transfer NFTs: {error}", account=from_address, error=e)
             return False
 
+    @timed('nft.burn')
     def burn_random_nfts(self, from_address, private_key):
         try:
-            if from_address not in self.owned_tokens or not self.owned_tokens[from_address]:
-                print(Fore.YELLOW + "No NFTs available to burn")
+            available = self.ownership.count(from_address)
+            if not available:
+                log_event('warning', "No NFTs available to burn", account=from_address)
                 return False
 
-            burn_count = random.randint(1, min(2, len(self.owned_tokens[from_address])))
-            tokens_to_burn = random.sample(self.owned_tokens[from_address], burn_count)
-
-            for token_id in tokens_to_burn:
-                transaction = self.nft_contract.functions.burn(
-                    token_id
-                ).build_transaction({
-                    'from': from_address,
-                    'nonce': self.web3.eth.get_transaction_count(from_address),
-                    'gas': 200000,
-                    'gasPrice': self.web3.eth.gas_price
-                })
-
-                signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
-                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-                # Update tracking
-                self.owned_tokens[from_address].remove(token_id)
+            tokens_to_burn = self.ownership.pick(from_address, random.randint(1, min(2, available)))
+            if not tokens_to_burn:
+                log_event('warning', "No NFTs available to burn", account=from_address)
+                return False
+            try:
+                burned = self.burn_batch(from_address, private_key, tokens_to_burn)
+            finally:
+                self.ownership.release(tokens_to_burn)
 
-            print(Fore.GREEN + f"Burned {burn_count} NFTs {CHECK_MARK}")
+            log_event('ok', "Burned {count} NFTs", account=from_address, count=len(burned))
             return True
 
         except Exception as e:
-            print(Fore.RED + f"Failed to burn NFTs: {str(e)} {CROSS_MARK}")
+            log_event('error', "Failed to burn NFTs: {error}", account=from_address, error=e)
             return False
 
-def deploy_storage_contract(web3, account_address, private_key):
+@timed('storage.deploy')
+def deploy_storage_contract(web3, account_address, private_key, tx_sender=None, clone_factory=None, salt=None):
     try:
-        compiled_sol = compile_source(SIMPLE_STORAGE_SOURCE)
-        contract_interface = compiled_sol['<stdin>:SimpleStorage']
+        tx_sender = tx_sender or TransactionSender(web3)
+        contract_interface = compile_contract(SIMPLE_STORAGE_SOURCE, 'SimpleStorage', SOLC_VERSION)
 
         SimpleStorage = web3.eth.contract(
             abi=contract_interface['abi'],
             bytecode=contract_interface['bin']
         )
 
-        transaction = SimpleStorage.constructor().build_transaction({
-            'from': account_address,
-            'nonce': web3.eth.get_transaction_count(account_address),
-            'gas': 2000000,
-            'gasPrice': web3.eth.gas_price
-        })
+        if clone_factory is not None:
+            # Factory mode: one implementation, every instance is an initialized minimal proxy
+            implementation = clone_factory.implementation('SimpleStorage', contract_interface, account_address, private_key)
+            address, receipt = clone_factory.clone(
+                implementation, SimpleStorage.encode_abi('initialize', [account_address]),
+                account_address, private_key, salt
+            )
+            log_event('ok', "Storage Contract cloned at {contract}", account=account_address, contract=address, receipt=receipt)
+            return address
 
-        signed_tx = web3.eth.account.sign_transaction(transaction, private_key)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_receipt = tx_sender.transact(
+            SimpleStorage.constructor(),
+            account_address, private_key
+        )
 
-        print(Fore.GREEN + f"Storage Contract deployed at {tx_receipt.contractAddress} {CHECK_MARK}")
+        log_event('ok', "Storage Contract deployed at {contract}", account=account_address,
+                  contract=tx_receipt.contractAddress, receipt=tx_receipt)
         return tx_receipt.contractAddress
 
     except Exception as e:
-        print(Fore.RED + f"Failed to deploy storage contract: {str(e)} {CROSS_MARK}")
+        log_event('error', "Failed to deploy storage contract: {error}", account=account_address, error=e)
         return None
 
-def send_native_token(web3, sender_address, private_key, receiver_address, amount):
+def storage_gas_report(web3, tx_sender, clone_factory, account_address, private_key):
+    contract_interface = compile_contract(SIMPLE_STORAGE_SOURCE, 'SimpleStorage', SOLC_VERSION)
+    SimpleStorage = web3.eth.contract(abi=contract_interface['abi'], bytecode=contract_interface['bin'])
+    init_data = SimpleStorage.encode_abi('initialize', [account_address])
+
+    # Setup costs are paid once and kept out of the per-deploy comparison
+    implementation = clone_factory.implementation('SimpleStorage', contract_interface, account_address, private_key)
+    clone_factory.ensure_deployed(account_address, private_key)
+
+    salt = secrets.token_bytes(32)
+    predicted = clone_factory.predict_address(implementation, salt)
+    receipts = {
+        'full': tx_sender.transact(SimpleStorage.constructor(), account_address, private_key),
+        'clone': clone_factory.clone(implementation, init_data, account_address, private_key)[1],
+    }
+    address, receipts['create2'] = clone_factory.clone(implementation, init_data, account_address, private_key, salt)
+
+    print(Fore.CYAN + "\nSimpleStorage deployment cost per instance:")
+    full_gas = receipts['full']['gasUsed']
+    for mode, receipt in receipts.items():
+        calldata = len(web3.eth.get_transaction(receipt['transactionHash'])['input'])
+        print(Fore.BLUE + f"  {mode:<8} gas {receipt['gasUsed']:>8} ({receipt['gasUsed'] / full_gas:6.1%})  calldata {calldata:>6} bytes")
+    print((Fore.GREEN if address == predicted else Fore.RED) +
+          f"  create2 address {address}, predicted offline {predicted}")
+
+@timed('native.send')
+def send_native_token(web3, sender_address, private_key, receiver_address, amount, tx_sender=None):
     try:
+        tx_sender = tx_sender or TransactionSender(web3)
         transaction = {
-            'nonce': web3.eth.get_transaction_count(sender_address),
             'to': receiver_address,
             'value': web3.to_wei(amount, 'ether'),
             'gas': 21000,
-            'gasPrice': web3.eth.gas_price,
             'chainId': CHAIN_ID
         }
 
-        signed_tx = web3.eth.account.sign_transaction(transaction, private_key)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        web3.eth.wait_for_transaction_receipt(tx_hash)
+        receipt = tx_sender.send(transaction, sender_address, private_key)
 
-        print(Fore.GREEN + f"Native token sent to {receiver_address} {CHECK_MARK}")
+        log_event('ok', "Native token sent to {to}", account=sender_address, to=receiver_address, receipt=receipt)
         return True
 
     except Exception as e:
-        print(Fore.RED + f"Failed to send native token: {str(e)} {CROSS_MARK}")
+        log_event('error', "Failed to send native token: {error}", account=sender_address, error=e)
         return False
 
+@timed('native.disperse')
+def disperse_native_token(web3, disperser, sender_address, private_key, receiver_addresses, amount):
+    try:
+        results = disperser.send_native(
+            sender_address, private_key,
+            [(receiver_address, web3.to_wei(amount, 'ether')) for receiver_address in receiver_addresses]
+        )
+        return report_payments(results, "native token", sender_address)
+
+    except Exception as e:
+        log_event('error', "Failed to disperse native token: {error}", account=sender_address, error=e)
+        return False
+
+def report_payments(results, label, sender_address=None):
+    sent = sum(1 for result in results if result.success)
+    transactions = len({result.tx_hash for result in results if result.tx_hash})
+    log_event('ok', "Sent {label} to {sent}/{recipients} recipients in {transactions} transaction(s)",
+              account=sender_address, label=label, sent=sent, recipients=len(results), transactions=transactions)
+    for result in results:
+        if not result.success:
+            log_event('warning', "  {to}: {error}", account=sender_address, to=result.recipient, error=result.error)
+    return sent == len(results)
+
+def load_accounts(web3):
+    return load_all_accounts(
+        web3.to_checksum_address, ACCOUNT_KEYSTORE_DIR, KEYSTORE_PASSWORD,
+        ACCOUNT_MNEMONIC, MNEMONIC_START, MNEMONIC_COUNT, ACCOUNT_LOADER_WORKERS or None
+    )
+
+def build_operations(web3, tx_sender, token_manager, nft_manager, sender_address, private_key,
+                     clone_factory=None, storage_mode='full', receiver_pool=None):
+    # Random receiver address, taken from the pre-generated pool when there is one
+    next_receiver = receiver_pool.next if receiver_pool is not None else random_address
+    random_receiver = next_receiver()
+
+    if FANOUT_RECIPIENTS > 1:
+        receivers = [random_receiver] + [next_receiver() for _ in range(FANOUT_RECIPIENTS - 1)]
+        send_native = lambda: disperse_native_token(web3, token_manager.disperser, sender_address, private_key, receivers, random.uniform(0.00001, 0.0001))
+        send_tokens = lambda: token_manager.disperse_random_amounts(sender_address, private_key, receivers)
+    else:
+        send_native = lambda: send_native_token(web3, sender_address, private_key, random_receiver, random.uniform(0.00001, 0.0001), tx_sender)
+        send_tokens = lambda: token_manager.transfer_random_amount(sender_address, private_key, random_receiver)
+
+    # Names are the keys of OPERATION_WEIGHTS, operation_weights validates against them
+    return [
+        ('send_native', send_native),
+        ('deploy_storage', lambda: deploy_storage_contract(
+            web3, sender_address, private_key, tx_sender,
+            clone_factory if storage_mode != 'full' else None,
+            secrets.token_bytes(32) if storage_mode == 'create2' else None
+        )),
+        ('send_tokens', send_tokens),
+        ('transfer_nfts', lambda: nft_manager.transfer_random_nfts(sender_address, private_key, random_receiver)),
+        ('burn_tokens', lambda: token_manager.burn_random_amount(sender_address, private_key)),
+        ('burn_nfts', lambda: nft_manager.burn_random_nfts(sender_address, private_key)),
+        ('mint_tokens', lambda: token_manager.mint_random_amount(sender_address, private_key, sender_address)),
+        ('mint_nfts', lambda: nft_manager.mint_random_nfts(sender_address, private_key, sender_address))
+    ]
+
+def operation_weights(spec):
+    try:
+        weights = parse_weights(spec)
+    except ValueError:
+        raise SystemExit(f"Invalid OPERATION_WEIGHTS {spec!r}, expected name:weight pairs such as send_native:3,mint_nfts:1")
+    # The operations are only built here for their names, nothing is called
+    names = [name for name, _ in build_operations(None, None, None, None, None, None)]
+    unknown = sorted(set(weights) - set(names))
+    if unknown:
+        raise SystemExit(f"Unknown operations in OPERATION_WEIGHTS: {', '.join(unknown)} (choose from {', '.join(names)})")
+    return weights
+
+def load_artifacts():
+    for source, contract_name in [
+        (TOKEN_CONTRACT_SOURCE, 'DezToken'),
+        (NFT_CONTRACT_SOURCE, 'DezNFT'),
+        (SIMPLE_STORAGE_SOURCE, 'SimpleStorage'),
+        (MULTICALL_SOURCE, 'Multicall'),
+        (DISPERSE_SOURCE, 'Disperse'),
+        (CLONE_FACTORY_SOURCE, 'CloneFactory')
+    ]:
+        compile_contract(source, contract_name, SOLC_VERSION)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Zenchain testnet automation for ZCX, DEZ tokens and NFTs")
+    parser.add_argument('--precompile', action='store_true',
+                        help="compile all contracts into the artifact cache and exit")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="drive all accounts concurrently with the asyncio engine")
+    parser.add_argument('--max-concurrency', type=int, default=16,
+                        help="maximum operations in flight across all accounts (async mode)")
+    parser.add_argument('--per-account-concurrency', type=int, default=1,
+                        help="maximum operations in flight per account (async mode)")
+    parser.add_argument('--storage-mode', choices=('full', 'clone', 'create2'), default=STORAGE_MODE,
+                        help="deploy SimpleStorage in full, or as minimal proxies through the CREATE2 factory")
+    parser.add_argument('--storage-report', action='store_true',
+                        help="deploy SimpleStorage once per mode, print the gas comparison and exit")
+    return parser.parse_args()
+
+def print_dropped_report(receipt_tracker):
+    dropped = receipt_tracker.dropped_report() if receipt_tracker else []
+    if dropped:
+        print(Fore.YELLOW + "Dropped or unconfirmed transactions:")
+        for entry in dropped:
+            print(Fore.YELLOW + f"  {entry['tx_hash']} {entry['status']} after {entry['waited']}s")
+
+def print_replacement_report(watchdog):
+    outcomes = watchdog.report() if watchdog else []
+    if outcomes:
+        print(Fore.YELLOW + "Fee-bumped replacements:")
+        for outcome in outcomes:
+            print(Fore.YELLOW + f"  {outcome['account']} nonce {outcome['nonce']}: {outcome['status']} "
+                  f"after {outcome['attempts']} attempt(s)")
+
 def main():
+    args = parse_args()
+    weights = operation_weights(OPERATION_WEIGHTS)
+    receipt_tracker = None
+    watchdog = None
+    signer = None
+    EVENTS.configure(
+        build_sinks(LOG_CONSOLE, LOG_CONSOLE_RATE, LOG_FILE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS), LOG_QUEUE_SIZE
+    )
     try:
-        # Initialize managers
-        token_manager = TokenManager(web3)
-        nft_manager = NFTManager(web3)
+        load_artifacts()
+        print(Fore.CYAN + f"Startup ready in {time.perf_counter() - STARTUP_BEGIN:.2f}s "
+              f"(artifact cache {artifact_cache.stats()})")
+        if args.precompile:
+            return
+
+        # Heavy imports are deferred until we actually talk to the chain
+        from web3 import Web3
+        from rpc_pool import build_provider
+
+        web3 = Web3(build_provider(RPC_URL, RPC_URLS, RPC_WRITE_URL, pool_size=RPC_POOL_SIZE))
+        web3.middleware_onion.add(metrics_middleware(), 'metrics')
+        if METRICS_PORT:
+            start_http_server(METRICS_PORT, METRICS_HOST)
+            print(Fore.CYAN + f"Metrics served at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        if METRICS_SNAPSHOT:
+            start_snapshots(METRICS_SNAPSHOT, METRICS_SNAPSHOT_INTERVAL)
+
+        # Initialize managers, sharing one nonce manager across every sender
+        fee_oracle = FeeOracle(web3, FEE_TTL, FEE_MODE == 'eip1559', FEE_PERCENTILE)
+        receipt_tracker = ReceiptTracker(web3, RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT)
+        nonce_manager = NonceManager(web3)
+        signer = SigningPipeline(SIGNER_WORKERS, SIGNER_QUEUE_SIZE) if SIGNER_WORKERS > 0 else None
+        tx_sender = TransactionSender(
+            web3, nonce_manager, fee_oracle, CHAIN_ID, GasProfileCache(web3, GAS_MARGIN), receipt_tracker, signer
+        )
+        if STUCK_AFTER > 0:
+            watchdog = tx_sender.watchdog = StuckTransactionWatchdog(
+                tx_sender, STUCK_AFTER, FEE_BUMP_PERCENT, MAX_FEE_BUMPS, Web3.to_wei(MAX_FEE_GWEI, 'gwei')
+            )
+        ledger = tx_sender.ledger = BalanceLedger(LEDGER_RECHECK_BLOCKS, web3.eth.block_number)
+
+        batch_reader = BatchReader(web3, RPC_BATCH_SIZE)
+        multicall = Multicall(web3, SOLC_VERSION, tx_sender, MULTICALL_BATCH_SIZE)
+        indexer = EventIndexer(
+            web3, INDEXER_DB, INDEXER_REORG_DEPTH, INDEXER_CHUNK_SIZE, poll_interval=INDEXER_POLL_INTERVAL,
+            chain_id=CHAIN_ID
+        ) if INDEXER_DB else None
+        registry = DeploymentRegistry(DEPLOYMENT_REGISTRY) if DEPLOYMENT_REGISTRY else None
+        token_manager = TokenManager(web3, tx_sender, multicall, indexer, registry=registry)
+        nft_manager = NFTManager(web3, tx_sender, multicall, indexer, registry=registry)
 
         # Load accounts from .env
-        accounts = []
-        index = 1
-        while True:
-            address = os.getenv(f'ACCOUNT_ADDRESS_{index}')
-            private_key = os.getenv(f'PRIVATE_KEY_{index}')
-            if not address or not private_key:
-                break
-            accounts.append((web3.to_checksum_address(address), private_key))
-            index += 1
+        accounts = load_accounts(web3)
 
         if not accounts:
             print(Fore.RED + "No accounts found in .env file")
             return
 
+        clone_factory = CloneFactory(web3, SOLC_VERSION, tx_sender)
+        if args.storage_report:
+            storage_gas_report(web3, tx_sender, clone_factory, accounts[0][0], accounts[0][1])
+            return
+
+        # Fills in the background while the contracts deploy
+        receiver_pool = ReceiverPool(RECEIVER_POOL_SIZE, RECEIVER_FILE or None)
+
         # Deploy initial contracts with first account
-        print(Fore.CYAN + "\nInitializing contracts...")
+        log_event('info', "Initializing contracts...")
+        try:
+            log_event('ok', "Multicall aggregator at {contract}",
+                      contract=multicall.ensure(accounts[0][0], accounts[0][1], MULTICALL_ADDRESS))
+        except Exception as e:
+            log_event('warning', "Multicall unavailable, falling back to single reads: {error}", error=e)
         token_manager.deploy_token(accounts[0][0], accounts[0][1])
         nft_manager.deploy_nft(accounts[0][0], accounts[0][1])
 
-        print(Fore.CYAN + "\nStarting main operation loop...")
+        def operations_for(sender_address, private_key):
+            return build_operations(
+                web3, tx_sender, token_manager, nft_manager, sender_address, private_key,
+                clone_factory, args.storage_mode, receiver_pool
+            )
+
+        if indexer is not None:
+            # Catch up once, then follow new blocks in the background
+            log_event('ok', "Event index synced to block {block}", block=indexer.sync())
+            indexer.start()
+
+        scheduler = RateScheduler(TARGET_TPS, RATE_BURST, ACCOUNT_TPS, ACCOUNT_BURST, weights)
+
+        if args.use_async:
+            log_event('info', "Starting async engine for {accounts} accounts...", accounts=len(accounts))
+            engine = AsyncEngine(scheduler, args.max_concurrency, args.per_account_concurrency)
+            asyncio.run(engine.run(accounts, operations_for))
+            return
+
+        log_event('info', "Starting main operation loop...")
         while True:
-            for sender_address, private_key in accounts:
+            # Balances come from the ledger, the batched read only covers accounts it can no longer vouch for
+            addresses = [address for address, _ in accounts]
+            states = batch_reader.account_states(ledger.needs_refresh(NATIVE, addresses))
+            if indexer is not None:
+                indexer.sync()
+            ledger.seed(NATIVE, {state.address: state.native_balance for state in states})
+            if token_manager.token_contract is not None:
+                stale = ledger.needs_refresh(TOKEN, addresses)
+                if stale:
+                    ledger.seed(TOKEN, token_manager.balances_of(stale))
+            for state in states:
+                nonce_manager.seed(state.address, state.nonce)
+            for address in addresses:
+                log_event('info', "{account}: {balance} ZCX", account=address,
+                          balance=web3.from_wei(ledger.native_balance(address), 'ether'))
+
+            # One round of the mix per account, the scheduler serves whichever account its buckets release first
+            operations = {address: operations_for(address, private_key) for address, private_key in accounts}
+            for _ in range(sum(len(account_operations) for account_operations in operations.values())):
+                sender_address, private_key = scheduler.next_account(accounts)
+                name, operation = scheduler.choose(operations[sender_address])
                 try:
-                    print("\n" + Fore.YELLOW + "=" * 50)
-                    print(Fore.CYAN + f"Processing account: {sender_address}")
-
-                    # Create random receiver address
-                    random_receiver = Account.create()
-                    
-                    # Execute operations
-                    operations = [
-                        lambda: send_native_token(web3, sender_address, private_key, random_receiver.address, random.uniform(0.00001, 0.0001)),
-                        lambda: deploy_storage_contract(web3, sender_address, private_key),
-                        lambda: token_manager.transfer_random_amount(sender_address, private_key, random_receiver.address),
-                        lambda: nft_manager.transfer_random_nfts(sender_address, private_key, random_receiver.address),
-                        lambda: token_manager.burn_random_amount(sender_address, private_key),
-                        lambda: nft_manager.burn_random_nfts(sender_address, private_key),
-                        lambda: token_manager.mint_random_amount(sender_address, private_key, sender_address),
-                        lambda: nft_manager.mint_random_nfts(sender_address, private_key, sender_address)
-                    ]
-
-                    # Execute operations in random order
-                    random.shuffle(operations)
-                    for operation in operations:
-                        operation()
-                        time.sleep(random.uniform(1, 3))  # Random delay between operations
-
-                    print(Fore.YELLOW + "=" * 50 + "\n")
-                    time.sleep(random.uniform(5, 10))  # Random delay between accounts
+                    operation()
 
                 except Exception as e:
-                    print(Fore.RED + f"Error processing account {sender_address}: {str(e)}")
+                    log_event('error', "Error processing account {account} ({name}): {error}",
+                              account=sender_address, name=name, error=e)
                     continue
 
+            log_event('info', "Rate: {rate}, ledger corrections: {corrections}",
+                      rate=scheduler.report(), corrections=ledger.corrections)
+
     except KeyboardInterrupt:
+        # Whatever is still queued is written before the final report
+        EVENTS.close()
         print(Fore.YELLOW + "\n🔴 Program stopped by user")
+        print_dropped_report(receipt_tracker)
+        print_replacement_report(watchdog)
+        if METRICS_SNAPSHOT:
+            write_snapshot(METRICS_SNAPSHOT)
     except Exception as e:
+        EVENTS.close()
         print(Fore.RED + f"\nCritical error: {str(e)}")
+    finally:
+        EVENTS.close()
+        if signer is not None:
+            signer.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,222 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds, from a cached local read up to a slow receipt wait
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+FAMILIES = {
+    'rpc': ('zen_rpc', 'JSON-RPC request', 'method'),
+    'operation': ('zen_operation', 'bot operation', 'operation'),
+}
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.errors += error
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation, good enough to spot a slow method
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.started_at = time.time()
+        self.batched = {}
+        self._series = {family: {} for family in FAMILIES}
+        self._lock = threading.Lock()
+
+    def observe(self, family, name, seconds, error=False):
+        with self._lock:
+            histogram = self._series[family].get(name)
+            if histogram is None:
+                histogram = self._series[family][name] = Histogram()
+            histogram.observe(seconds, error)
+
+    def count_batched(self, methods):
+        with self._lock:
+            for method in methods:
+                self.batched[method] = self.batched.get(method, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'uptime': round(time.time() - self.started_at, 1),
+                'batched_requests': dict(self.batched),
+                **{
+                    family: {
+                        name: {
+                            'count': histogram.count,
+                            'errors': histogram.errors,
+                            'mean': round(histogram.total / histogram.count, 6) if histogram.count else None,
+                            'p50': histogram.quantile(0.5),
+                            'p95': histogram.quantile(0.95),
+                            'p99': histogram.quantile(0.99),
+                        }
+                        for name, histogram in sorted(series.items())
+                    }
+                    for family, series in self._series.items()
+                }
+            }
+
+    def prometheus(self):
+        lines = []
+        with self._lock:
+            for family, (prefix, description, label) in FAMILIES.items():
+                series = sorted(self._series[family].items())
+                lines += [f"# HELP {prefix}_duration_seconds Latency per {description}",
+                          f"# TYPE {prefix}_duration_seconds histogram"]
+                for name, histogram in series:
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{prefix}_duration_seconds_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{prefix}_duration_seconds_sum{{{label}="{name}"}} {histogram.total}')
+                    lines.append(f'{prefix}_duration_seconds_count{{{label}="{name}"}} {histogram.count}')
+                lines += [f"# HELP {prefix}_errors_total Failed {description}s",
+                          f"# TYPE {prefix}_errors_total counter"]
+                lines += [f'{prefix}_errors_total{{{label}="{name}"}} {histogram.errors}' for name, histogram in series]
+            lines += ["# HELP zen_rpc_batched_requests_total Requests sent inside JSON-RPC batches",
+                      "# TYPE zen_rpc_batched_requests_total counter"]
+            lines += [f'zen_rpc_batched_requests_total{{method="{method}"}} {count}'
+                      for method, count in sorted(self.batched.items())]
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by the timing decorator, the web3 middleware and the receipt tracker
+METRICS = MetricsRegistry()
+
+_context = threading.local()
+
+
+def current_operation():
+    # (name, perf_counter start) of the innermost @timed call on this thread, or None
+    return getattr(_context, 'operation', None)
+
+
+def timed(name, registry=METRICS):
+    # Operations report failure by returning False or None, both count as errors
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outer = current_operation()
+            _context.operation = (name, started)
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                registry.observe('operation', name, time.perf_counter() - started, True)
+                raise
+            finally:
+                _context.operation = outer
+            registry.observe('operation', name, time.perf_counter() - started, result is False or result is None)
+            return result
+        return wrapper
+    return decorator
+
+
+def metrics_middleware(registry=METRICS):
+    from web3.middleware import Web3Middleware
+
+    class MetricsMiddleware(Web3Middleware):
+        def wrap_make_request(self, make_request):
+            def middleware(method, params):
+                started = time.perf_counter()
+                try:
+                    response = make_request(method, params)
+                except Exception:
+                    registry.observe('rpc', method, time.perf_counter() - started, True)
+                    raise
+                registry.observe('rpc', method, time.perf_counter() - started,
+                                 isinstance(response, dict) and 'error' in response)
+                return response
+            return middleware
+
+        def wrap_make_batch_request(self, make_batch_request):
+            # A batch is one round trip, its latency is recorded once and its contents are counted
+            def middleware(requests_info):
+                registry.count_batched(method for method, _ in requests_info)
+                started = time.perf_counter()
+                try:
+                    responses = make_batch_request(requests_info)
+                except Exception:
+                    registry.observe('rpc', 'batch', time.perf_counter() - started, True)
+                    raise
+                registry.observe('rpc', 'batch', time.perf_counter() - started,
+                                 not isinstance(responses, list) or
+                                 any(isinstance(response, dict) and 'error' in response for response in responses))
+                return responses
+            return middleware
+
+    return MetricsMiddleware
+
+
+def start_http_server(port, host='127.0.0.1', registry=METRICS):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/metrics.json'):
+                body, content_type = json.dumps(registry.snapshot()).encode(), 'application/json'
+            elif self.path.startswith('/metrics'):
+                body, content_type = registry.prometheus().encode(), 'text/plain; version=0.0.4'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def write_snapshot(path, registry=METRICS):
+    # Written aside and renamed so readers never see half a file
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump(registry.snapshot(), f, indent=2)
+    os.replace(temporary, path)
+
+
+def start_snapshots(path, interval=60, registry=METRICS):
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                write_snapshot(path, registry)
+            except OSError:
+                pass
+
+    threading.Thread(target=run, name='metrics-snapshot', daemon=True).start()
+    return stop
@@ -0,0 +1,129 @@
+from eth_utils.abi import get_abi_output_types
+from artifact_cache import compile_contract
+
+MULTICALL_SOURCE = '''
+pragma solidity ^0.8.19;
+
+contract Multicall {
+    struct Call3 {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    function aggregate3(Call3[] calldata calls) public view returns (Result[] memory returnData) {
+        returnData = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory data) = calls[i].target.staticcall(calls[i].callData);
+            require(success || calls[i].allowFailure, "Multicall: call failed");
+            returnData[i] = Result(success, data);
+        }
+    }
+
+    function getEthBalance(address account) public view returns (uint256) {
+        return account.balance;
+    }
+}
+'''
+
+# Multicall3 is pre-deployed here on most EVM chains, its aggregate3 matches our ABI
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+
+class Multicall:
+    def __init__(self, web3, solc_version, tx_sender=None, max_calls=500):
+        self.web3 = web3
+        self.solc_version = solc_version
+        self.tx_sender = tx_sender
+        self.max_calls = max_calls
+        self.contract = None
+        self.eth_calls = 0
+
+    def _interface(self):
+        return compile_contract(MULTICALL_SOURCE, 'Multicall', self.solc_version)
+
+    def attach(self, address):
+        address = self.web3.to_checksum_address(address)
+        if not self.web3.eth.get_code(address):
+            return False
+        self.contract = self.web3.eth.contract(address=address, abi=self._interface()['abi'])
+        return True
+
+    def deploy(self, account_address, private_key):
+        if self.tx_sender is None:
+            from transactions import TransactionSender
+            self.tx_sender = TransactionSender(self.web3)
+        contract_interface = self._interface()
+        Multicall = self.web3.eth.contract(
+            abi=contract_interface['abi'],
+            bytecode=contract_interface['bin']
+        )
+        tx_receipt = self.tx_sender.transact(Multicall.constructor(), account_address, private_key)
+        return self.attach(tx_receipt.contractAddress)
+
+    def ensure(self, account_address, private_key, address=MULTICALL3_ADDRESS):
+        # Reuse an aggregator that is already on chain, deploy our own only when there is none
+        if not (address and self.attach(address)):
+            self.deploy(account_address, private_key)
+        return self.contract.address
+
+    def _decode(self, call, success, data):
+        if not success:
+            return None
+        output_types = get_abi_output_types(call.abi)
+        values = [
+            self.web3.to_checksum_address(value) if output_type == 'address' else value
+            for output_type, value in zip(output_types, self.web3.codec.decode(output_types, data))
+        ]
+        return values[0] if len(values) == 1 else tuple(values)
+
+    def _aggregate_chunk(self, calls, allow_failure):
+        self.eth_calls += 1
+        requests = [(call.address, allow_failure, call._encode_transaction_data()) for call in calls]
+        results = self.contract.functions.aggregate3(requests).call()
+        return [self._decode(call, success, data) for call, (success, data) in zip(calls, results)]
+
+    def _call_single(self, call, allow_failure):
+        self.eth_calls += 1
+        try:
+            return call.call()
+        except Exception:
+            if not allow_failure:
+                raise
+            return None
+
+    def aggregate(self, calls, allow_failure=False):
+        # Calls are unexecuted ContractFunction objects, failed ones come back as None with allow_failure
+        if self.contract is None:
+            # Without an aggregator each read is its own eth_call
+            return [self._call_single(call, allow_failure) for call in calls]
+
+        from web3.exceptions import ContractLogicError
+
+        results = []
+        index = 0
+        while index < len(calls):
+            chunk = calls[index:index + self.max_calls]
+            try:
+                results.extend(self._aggregate_chunk(chunk, allow_failure))
+                index += len(chunk)
+            except ContractLogicError:
+                raise
+            except Exception:
+                # Nodes cap eth_call gas and response size, a smaller chunk usually fits
+                if len(chunk) == 1:
+                    raise
+                self.max_calls = max(1, len(chunk) // 2)
+        return results
+
+    def native_balances(self, addresses):
+        if self.contract is None:
+            balances = [self.web3.eth.get_balance(address) for address in addresses]
+        else:
+            balances = self.aggregate([self.contract.functions.getEthBalance(address) for address in addresses])
+        return dict(zip(addresses, balances))
@@ -0,0 +1,120 @@
+import random
+import threading
+
+NFT_EVENTS = ('Mint', 'Transfer', 'Burn')
+
+
+def event_topics(contract, event_names):
+    return {
+        bytes(contract.w3.keccak(text=getattr(contract.events, name)().signature)): name
+        for name in event_names
+    }
+
+
+def decode_logs(contract, logs, event_names):
+    topics = event_topics(contract, event_names)
+    events = []
+    for log in logs:
+        name = topics.get(bytes(log['topics'][0])) if log['topics'] else None
+        if name is not None:
+            events.append(getattr(contract.events, name)().process_log(log))
+    return events
+
+
+class NFTOwnershipIndex:
+    def __init__(self):
+        self._owners = {}  # token id -> owner
+        self._tokens = {}  # owner -> token ids, unordered so removal can swap with the last one
+        self._positions = {}  # token id -> position in its owner's list
+        self._reserved = set()  # token ids picked by an operation that has not finished yet
+        self._lock = threading.Lock()
+
+    def _add(self, owner, token_id):
+        # DezNFT deployments from before nextTokenId can re-mint a live id, that moves it like a transfer
+        if token_id in self._owners:
+            self._remove(token_id)
+        tokens = self._tokens.setdefault(owner, [])
+        self._positions[token_id] = len(tokens)
+        tokens.append(token_id)
+        self._owners[token_id] = owner
+
+    def _remove(self, token_id):
+        owner = self._owners.pop(token_id, None)
+        if owner is None:
+            return
+        tokens = self._tokens[owner]
+        position = self._positions.pop(token_id)
+        last = tokens.pop()
+        if last != token_id:
+            tokens[position] = last
+            self._positions[last] = position
+
+    def apply_event(self, event):
+        with self._lock:
+            if event['event'] == 'Burn':
+                self._remove(event['args']['tokenId'])
+            else:
+                self._add(event['args']['to'], event['args']['tokenId'])
+
+    def apply_logs(self, contract, logs):
+        events = decode_logs(contract, logs, NFT_EVENTS)
+        for event in events:
+            self.apply_event(event)
+        return events
+
+    def apply_receipt(self, contract, receipt):
+        return self.apply_logs(contract, [log for log in receipt['logs'] if log['address'] == contract.address])
+
+    def rebuild(self, contract, from_block=0):
+        logs = contract.w3.eth.get_logs({
+            'address': contract.address,
+            'fromBlock': from_block,
+            'toBlock': 'latest'
+        })
+        with self._lock:
+            self._owners.clear()
+            self._tokens.clear()
+            self._positions.clear()
+        return len(self.apply_logs(contract, logs))
+
+    def load(self, owners):
+        with self._lock:
+            self._owners.clear()
+            self._tokens.clear()
+            self._positions.clear()
+            for token_id, owner in owners.items():
+                self._add(owner, token_id)
+        return len(owners)
+
+    def owner_of(self, token_id):
+        with self._lock:
+            return self._owners.get(token_id)
+
+    def tokens_of(self, owner):
+        with self._lock:
+            return list(self._tokens.get(owner, ()))
+
+    def count(self, owner):
+        with self._lock:
+            return len(self._tokens.get(owner, ()))
+
+    def pick(self, owner, count):
+        # Picked ids stay reserved until release(), so concurrent operations of one account never share one
+        with self._lock:
+            tokens = self._tokens.get(owner, [])
+            # Sampling positions keeps the pick O(count + reserved) instead of copying the whole list
+            sample = min(count + len(self._reserved), len(tokens))
+            picked = [
+                tokens[position] for position in random.sample(range(len(tokens)), sample)
+                if tokens[position] not in self._reserved
+            ][:count]
+            self._reserved.update(picked)
+            return picked
+
+    def release(self, token_ids):
+        with self._lock:
+            self._reserved.difference_update(token_ids)
+
+    def total(self):
+        with self._lock:
+            return len(self._owners)
@@ -0,0 +1,57 @@
+import threading
+
+# Errors that mean our local nonce drifted from what the node has seen
+NONCE_ERRORS = (
+    'nonce too low',
+    'replacement transaction underpriced',
+)
+
+
+def is_nonce_error(error):
+    message = str(error).lower()
+    return any(pattern in message for pattern in NONCE_ERRORS)
+
+
+class NonceManager:
+    def __init__(self, web3):
+        self.web3 = web3
+        self._nonces = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, address):
+        with self._locks_guard:
+            if address not in self._locks:
+                self._locks[address] = threading.Lock()
+            return self._locks[address]
+
+    def _fetch(self, address):
+        return self.web3.eth.get_transaction_count(address, 'pending')
+
+    def next_nonce(self, address):
+        with self._lock_for(address):
+            if address not in self._nonces:
+                self._nonces[address] = self._fetch(address)
+            nonce = self._nonces[address]
+            self._nonces[address] = nonce + 1
+            return nonce
+
+    def release(self, address, nonce):
+        # Give back a nonce whose transaction never reached the node
+        with self._lock_for(address):
+            if self._nonces.get(address) == nonce + 1:
+                self._nonces[address] = nonce
+            else:
+                # Later nonces are already out, the gap has to be re-read
+                self._nonces.pop(address, None)
+
+    def resync(self, address):
+        with self._lock_for(address):
+            self._nonces[address] = self._fetch(address)
+            return self._nonces[address]
+
+    def seed(self, address, nonce):
+        # Take a nonce read elsewhere (e.g. a batched pass snapshot) unless we already track one
+        with self._lock_for(address):
+            if address not in self._nonces:
+                self._nonces[address] = nonce
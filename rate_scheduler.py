@@ -0,0 +1,116 @@
+import asyncio
+import random
+import threading
+import time
+
+
+def parse_weights(spec):
+    # "send_native:3,deploy_storage:1" -> {'send_native': 3.0, 'deploy_storage': 1.0}
+    weights = {}
+    for item in (spec or '').split(','):
+        if ':' in item:
+            name, weight = item.split(':', 1)
+            weights[name.strip()] = float(weight)
+    return weights
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_in(self, now):
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        if self.rate:
+            self._refill(now)
+            self.tokens -= 1
+
+
+class RateScheduler:
+    # A rate of 0 leaves that bucket unlimited
+    def __init__(self, target_tps, burst=1, account_tps=0, account_burst=1, weights=None):
+        self.target_tps = target_tps
+        self.account_tps = account_tps
+        self.account_burst = account_burst
+        self.weights = weights or {}
+        self.released = 0
+        self.started_at = None
+        self._global = TokenBucket(target_tps, burst)
+        self._accounts = {}
+        self._served = {}
+        self._lock = threading.Lock()
+
+    def _account_bucket(self, address):
+        bucket = self._accounts.get(address)
+        if bucket is None:
+            bucket = self._accounts[address] = TokenBucket(self.account_tps, self.account_burst)
+        return bucket
+
+    def try_acquire(self, address):
+        # Takes both tokens and returns 0, or returns how long until both are available
+        with self._lock:
+            now = time.monotonic()
+            if self.started_at is None:
+                self.started_at = now
+            account = self._account_bucket(address)
+            delay = max(self._global.ready_in(now), account.ready_in(now))
+            if delay == 0:
+                self._global.take(now)
+                account.take(now)
+                self._served[address] = now
+                self.released += 1
+            return delay
+
+    def wait(self, address):
+        while True:
+            delay = self.try_acquire(address)
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def wait_async(self, address):
+        # Only the calling account's worker sleeps, the event loop keeps serving the others
+        while True:
+            delay = self.try_acquire(address)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def next_account(self, accounts):
+        # Single-threaded callers serve whichever account is ready first instead of sleeping on one,
+        # ties go to the account served longest ago so the global bucket cannot starve anyone
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                account = min(accounts, key=lambda account: (
+                    self._account_bucket(account[0]).ready_in(now), self._served.get(account[0], 0.0)
+                ))
+            delay = self.try_acquire(account[0])
+            if not delay:
+                return account
+            time.sleep(delay)
+
+    def choose(self, operations):
+        # Operations are (name, callable) pairs, names without a weight count as 1
+        weights = [self.weights.get(name, 1.0) for name, _ in operations]
+        return random.choices(operations, weights=weights)[0]
+
+    def achieved_rate(self):
+        if self.started_at is None:
+            return 0.0
+        return self.released / max(time.monotonic() - self.started_at, 1e-9)
+
+    def report(self):
+        target = f"{self.target_tps:.2f}" if self.target_tps else "unlimited"
+        return f"{self.achieved_rate():.2f} ops/s achieved, target {target} ({self.released} released)"
@@ -0,0 +1,130 @@
+import threading
+import time
+from concurrent.futures import Future
+from metrics import METRICS
+
+
+class ReceiptTimeout(TimeoutError):
+    pass
+
+
+class ReceiptTracker:
+    def __init__(self, web3, poll_interval=1.0, timeout=120):
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.dropped = []
+        self._pending = {}
+        self._last_block = None
+        self._block_receipts_supported = True
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            # Anything tracked from now on can only land in a later block
+            self._last_block = self.web3.eth.block_number
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='receipt-tracker', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def track(self, tx_hash, callback=None):
+        self.start()
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        with self._lock:
+            self._pending[bytes(tx_hash)] = (future, time.monotonic())
+        return future
+
+    def forget(self, tx_hash):
+        with self._lock:
+            entry = self._pending.pop(bytes(tx_hash), None)
+        if entry is not None:
+            entry[0].cancel()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._poll()
+            except Exception:
+                # A failed poll is retried on the next tick, pending hashes stay tracked
+                pass
+            self._stop.wait(self.poll_interval)
+
+    def _block_receipts(self, block_number, pending_hashes):
+        if self._block_receipts_supported:
+            from web3.exceptions import MethodUnavailable
+            try:
+                return self.web3.eth.get_block_receipts(block_number)
+            except MethodUnavailable:
+                self._block_receipts_supported = False
+
+        block = self.web3.eth.get_block(block_number)
+        return [
+            self.web3.eth.get_transaction_receipt(tx_hash)
+            for tx_hash in block['transactions']
+            if bytes(tx_hash) in pending_hashes
+        ]
+
+    def _poll(self):
+        latest = self.web3.eth.block_number
+        while self._last_block < latest:
+            block_number = self._last_block + 1
+            with self._lock:
+                pending_hashes = set(self._pending)
+            if pending_hashes:
+                for receipt in self._block_receipts(block_number, pending_hashes):
+                    self._resolve(receipt)
+            self._last_block = block_number
+
+        self._expire()
+
+    def _resolve(self, receipt):
+        with self._lock:
+            entry = self._pending.pop(bytes(receipt['transactionHash']), None)
+        if entry is not None:
+            METRICS.observe('operation', 'receipt_wait', time.monotonic() - entry[1])
+            entry[0].set_result(receipt)
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                (tx_hash, entry) for tx_hash, entry in self._pending.items()
+                if now - entry[1] > self.timeout
+            ]
+            for tx_hash, _ in expired:
+                del self._pending[tx_hash]
+
+        for tx_hash, (future, submitted_at) in expired:
+            # One lookup per timed-out hash tells a dropped tx from a stuck one
+            try:
+                known = self.web3.eth.get_transaction(tx_hash) is not None
+            except Exception:
+                known = False
+            with self._lock:
+                self.dropped.append({
+                    'tx_hash': '0x' + tx_hash.hex(),
+                    'waited': round(now - submitted_at, 1),
+                    'status': 'pending' if known else 'dropped'
+                })
+            METRICS.observe('operation', 'receipt_wait', now - submitted_at, True)
+            future.set_exception(ReceiptTimeout(f"No receipt for 0x{tx_hash.hex()} after {self.timeout}s"))
+
+    def dropped_report(self):
+        with self._lock:
+            return list(self.dropped)
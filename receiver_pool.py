@@ -0,0 +1,93 @@
+import os
+import queue
+import threading
+from eth_utils import is_address, to_checksum_address
+
+
+def random_address():
+    # A receiver only needs to be a fresh address, nobody ever signs for it
+    return to_checksum_address(os.urandom(20))
+
+
+def random_addresses():
+    while True:
+        # One urandom call per block of addresses instead of one per address
+        block = os.urandom(20 * 256)
+        for offset in range(0, len(block), 20):
+            yield to_checksum_address(block[offset:offset + 20])
+
+
+def file_addresses(path, repeat=True):
+    # Streams the file line by line, blank lines, comments and malformed entries are skipped
+    while True:
+        found = False
+        with open(path) as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line and is_address(line):
+                    found = True
+                    yield to_checksum_address(line)
+        if not repeat or not found:
+            return
+
+
+class ReceiverPool:
+    def __init__(self, size=1000, path=None, repeat=True):
+        if path:
+            # A missing or unreadable file fails here at startup, not later on the filler thread
+            with open(path) as f:
+                f.readline()
+        self.size = size
+        self.path = path
+        self.served = 0
+        self.misses = 0
+        self._source = file_addresses(path, repeat) if path else random_addresses()
+        self._queue = queue.Queue(size)
+        self._stop = threading.Event()
+        self._exhausted = False
+        self._error = None
+        self._thread = threading.Thread(target=self._fill, name='receiver-pool', daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        try:
+            for address in self._source:
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(address, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if self._stop.is_set():
+                    return
+        except Exception as e:
+            # Kept for next(), which re-raises it once the addresses read so far are used up
+            self._error = e
+        finally:
+            self._exhausted = True
+
+    def next(self):
+        self.served += 1
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            self.misses += 1
+        if not self.path:
+            # The filler fell behind, one address inline costs less than waiting for it
+            return random_address()
+        # File addresses are the only valid receivers, so wait for the reader until the file runs out
+        while not self._exhausted or not self._queue.empty():
+            try:
+                return self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        if self._error is not None:
+            raise self._error
+        raise LookupError(f"No receiver addresses left in {self.path}")
+
+    def take(self, count):
+        return [self.next() for _ in range(count)]
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
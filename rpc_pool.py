@@ -0,0 +1,159 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import HTTPProvider
+from web3.providers.base import JSONBaseProvider
+
+# Writes go to the preferred endpoint so every nonce lands in the same mempool first
+WRITE_METHODS = {'eth_sendRawTransaction', 'eth_sendTransaction'}
+
+# Only that mempool is sure to hold our just-sent transactions, so pending nonces are read there too
+PENDING_METHODS = {'eth_getTransactionCount'}
+
+THROTTLE_ERRORS = ('rate limit', 'too many requests', 'request limit')
+
+
+def is_pinned(method, params):
+    if method in WRITE_METHODS:
+        return True
+    return method in PENDING_METHODS and bool(params) and params[-1] == 'pending'
+
+
+def is_throttled(response):
+    error = response.get('error') if isinstance(response, dict) else None
+    if not error:
+        return False
+    message = str(error.get('message', '') if isinstance(error, dict) else error).lower()
+    return any(pattern in message for pattern in THROTTLE_ERRORS)
+
+
+class Endpoint:
+    def __init__(self, url, pool_size=20, timeout=10):
+        self.url = url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Retries are the pool's job, a failing endpoint should give up quickly
+        self.provider = HTTPProvider(
+            url,
+            request_kwargs={'timeout': timeout},
+            session=self.session,
+            exception_retry_configuration=None
+        )
+        self.latency = None
+        self.requests = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    def available(self, now):
+        return now >= self.ejected_until
+
+    def score(self):
+        # Unmeasured endpoints look fast so they get tried early
+        return self.latency if self.latency is not None else 0.0
+
+    def stats(self):
+        return {
+            'url': self.url,
+            'latency': self.latency,
+            'requests': self.requests,
+            'failures': self.failures,
+            'ejected': time.monotonic() < self.ejected_until
+        }
+
+
+class RPCPool(JSONBaseProvider):
+    def __init__(self, urls, write_url=None, pool_size=20, timeout=10,
+                 max_failures=3, eject_seconds=30, latency_smoothing=0.2):
+        super().__init__()
+        self.endpoints = [Endpoint(url, pool_size, timeout) for url in urls]
+        self.write_endpoint = next(
+            (endpoint for endpoint in self.endpoints if endpoint.url == write_url),
+            None
+        )
+        if self.write_endpoint is None:
+            self.write_endpoint = Endpoint(write_url, pool_size, timeout) if write_url else self.endpoints[0]
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.latency_smoothing = latency_smoothing
+        self._lock = threading.Lock()
+
+    def _choose(self, tried):
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e not in tried and e.available(now)]
+        if not candidates:
+            # Everything is ejected, probing an ejected endpoint beats failing outright
+            candidates = [e for e in self.endpoints if e not in tried]
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        # Weighted by inverse latency: the fastest endpoint gets most traffic, none starves
+        weights = [1.0 / max(endpoint.score(), 0.001) for endpoint in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    def _record_success(self, endpoint, elapsed):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.failures = 0
+            endpoint.ejected_until = 0.0
+            if endpoint.latency is None:
+                endpoint.latency = elapsed
+            else:
+                endpoint.latency += self.latency_smoothing * (elapsed - endpoint.latency)
+
+    def _record_failure(self, endpoint):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.ejected_until = time.monotonic() + self.eject_seconds
+
+    def _dispatch(self, call, write=False):
+        tried = []
+        last_error = None
+        endpoint = self.write_endpoint if write else self._choose(tried)
+        while endpoint is not None:
+            started = time.perf_counter()
+            try:
+                response = call(endpoint.provider)
+            except Exception as e:
+                last_error = e
+                self._record_failure(endpoint)
+            else:
+                responses = response if isinstance(response, list) else [response]
+                if not any(is_throttled(item) for item in responses):
+                    self._record_success(endpoint, time.perf_counter() - started)
+                    return response
+                last_error = None
+                self._record_failure(endpoint)
+            tried.append(endpoint)
+            endpoint = self._choose(tried)
+
+        if last_error is not None:
+            raise last_error
+        return response
+
+    def make_request(self, method, params):
+        return self._dispatch(
+            lambda provider: provider.make_request(method, params),
+            write=is_pinned(method, params)
+        )
+
+    def make_batch_request(self, batch_requests):
+        return self._dispatch(
+            lambda provider: provider.make_batch_request(batch_requests),
+            write=any(is_pinned(method, params) for method, params in batch_requests)
+        )
+
+    def is_connected(self, show_traceback=False):
+        return any(endpoint.provider.is_connected(show_traceback) for endpoint in self.endpoints)
+
+    def stats(self):
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+
+def build_provider(rpc_url, rpc_urls=None, write_url=None, **kwargs):
+    urls = [url.strip() for url in (rpc_urls or '').split(',') if url.strip()] or [rpc_url]
+    return RPCPool(urls, write_url or None, **kwargs)
@@ -0,0 +1,57 @@
+import importlib
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+def sign_transaction(transaction, private_key):
+    from eth_account import Account
+
+    signed_tx = Account.sign_transaction(transaction, private_key)
+    return bytes(signed_tx.raw_transaction), bytes(signed_tx.hash)
+
+
+def _ignore_interrupt():
+    # Ctrl+C reaches the whole process group, the parent shuts the pool down on its own
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _warm_up(_):
+    # Pays the eth_account import cost before the first real transaction
+    importlib.import_module('eth_account')
+    return os.getpid()
+
+
+class SigningPipeline:
+    # Optional process-pool signing for the async engine: worker threads sign in parallel instead of
+    # taking turns on the GIL. Each send still waits for its own signature, so sequential runs gain nothing.
+    def __init__(self, max_workers=None, queue_size=64):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.signed = 0
+        self.executor = ProcessPoolExecutor(self.max_workers, initializer=_ignore_interrupt)
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._lock = threading.Lock()
+        # Fork the workers now, before receipt trackers and engines start their threads
+        list(self.executor.map(_warm_up, range(self.max_workers)))
+
+    def _release(self, future):
+        self._slots.release()
+        if not future.cancelled() and future.exception() is None:
+            with self._lock:
+                self.signed += 1
+
+    def sign_async(self, transaction, private_key):
+        # Bounded: callers block here once queue_size signatures are outstanding across all threads
+        self._slots.acquire()
+        future = self.executor.submit(sign_transaction, transaction, private_key)
+        future.add_done_callback(self._release)
+        return future
+
+    def sign(self, transaction, private_key):
+        return self.sign_async(transaction, private_key).result()
+
+    def shutdown(self):
+        # Waiting is cheap with the queue cancelled, and leaves no wake-up pipe for the exit hook to trip on
+        self.executor.shutdown(wait=True, cancel_futures=True)
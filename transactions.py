@@ -0,0 +1,124 @@
+from concurrent.futures import Future
+from fee_oracle import FeeOracle
+from gas_profiles import GasProfileCache
+from nonce_manager import NonceManager, is_nonce_error
+from receipt_tracker import ReceiptTracker
+
+
+class TransactionSender:
+    def __init__(self, web3, nonce_manager=None, fee_oracle=None, chain_id=None, gas_profiles=None,
+                 receipt_tracker=None, signer=None):
+        self.web3 = web3
+        self.nonce_manager = nonce_manager or NonceManager(web3)
+        self.fee_oracle = fee_oracle or FeeOracle(web3)
+        self.chain_id = chain_id
+        self.gas_profiles = gas_profiles or GasProfileCache(web3)
+        self.receipt_tracker = receipt_tracker or ReceiptTracker(web3)
+        self.signer = signer
+        # Set to a StuckTransactionWatchdog to have unmined sends re-priced on the same nonce
+        self.watchdog = None
+        # Set to a BalanceLedger to have every receipt move our accounts' local balances
+        self.ledger = None
+
+    def tx_params(self, from_address, gas):
+        params = {'from': from_address, 'gas': gas}
+        params.update(self.fee_oracle.fee_fields())
+        # A known chain id saves build_transaction an eth_chainId call
+        if self.chain_id is not None:
+            params['chainId'] = self.chain_id
+        return params
+
+    def submit_call(self, contract_call, from_address, private_key, gas=None, units=None, value=None):
+        params = self.tx_params(from_address, gas or 0)
+        if value:
+            params['value'] = value
+        # A placeholder gas value stops build_transaction from estimating on its own
+        transaction = contract_call.build_transaction(params)
+        if gas is not None:
+            return self.submit(transaction, from_address, private_key)
+
+        profile_key = self.gas_profiles.profile_key(contract_call, transaction, units)
+        transaction['gas'] = self.gas_profiles.gas_limit(profile_key, transaction)
+
+        def record_gas(receipt_future):
+            if not receipt_future.cancelled() and receipt_future.exception() is None:
+                self.gas_profiles.record(profile_key, receipt_future.result(), transaction['gas'])
+
+        receipt_future = self.submit(transaction, from_address, private_key)
+        receipt_future.add_done_callback(record_gas)
+        return receipt_future
+
+    def transact(self, contract_call, from_address, private_key, gas=None, units=None, value=None):
+        return self.submit_call(contract_call, from_address, private_key, gas, units, value).result()
+
+    def sign(self, transaction, private_key):
+        if self.signer is not None:
+            return self.signer.sign(transaction, private_key)
+        signed_tx = self.web3.eth.account.sign_transaction(transaction, private_key)
+        return signed_tx.raw_transaction, signed_tx.hash
+
+    def _with_fees(self, transaction):
+        if 'gasPrice' not in transaction and 'maxFeePerGas' not in transaction:
+            transaction = dict(transaction, **self.fee_oracle.fee_fields())
+        return transaction
+
+    def _watched(self, transaction, from_address, private_key, tx_hash, receipt_future):
+        if self.watchdog is not None:
+            receipt_future = self.watchdog.watch(transaction, from_address, private_key, tx_hash, receipt_future)
+        if self.ledger is not None:
+            receipt_future = self._ledgered(transaction, from_address, receipt_future)
+        return receipt_future
+
+    def _ledgered(self, transaction, from_address, receipt_future):
+        # The ledger is updated before the caller sees the receipt, so its next pick reads the new balance
+        future = Future()
+
+        def settle(inner):
+            if inner.cancelled():
+                future.cancel()
+                return
+            error = inner.exception()
+            if error is not None:
+                self.ledger.invalidate(from_address)
+                future.set_exception(error)
+                return
+            try:
+                self.ledger.apply_receipt(from_address, transaction.get('value', 0), inner.result())
+            except Exception:
+                # A receipt the ledger cannot read leaves the account to be re-read
+                self.ledger.invalidate(from_address)
+            future.set_result(inner.result())
+
+        receipt_future.add_done_callback(settle)
+        return future
+
+    def _send_signed(self, raw_transaction, tx_hash):
+        # Tracked before sending so a block mined right away cannot slip past the tracker
+        receipt_future = self.receipt_tracker.track(tx_hash)
+        try:
+            self.web3.eth.send_raw_transaction(raw_transaction)
+            return receipt_future
+        except Exception:
+            self.receipt_tracker.forget(tx_hash)
+            raise
+
+    def submit(self, transaction, from_address, private_key):
+        transaction = self._with_fees(transaction)
+
+        # One resync-and-retry when the node rejects our local nonce
+        for attempt in range(2):
+            nonce = self.nonce_manager.next_nonce(from_address)
+            transaction = dict(transaction, nonce=nonce)
+            raw_transaction, tx_hash = self.sign(transaction, private_key)
+            try:
+                receipt_future = self._send_signed(raw_transaction, tx_hash)
+            except Exception as e:
+                if attempt == 0 and is_nonce_error(e):
+                    self.nonce_manager.resync(from_address)
+                    continue
+                self.nonce_manager.release(from_address, nonce)
+                raise
+            return self._watched(transaction, from_address, private_key, tx_hash, receipt_future)
+
+    def send(self, transaction, from_address, private_key):
+        return self.submit(transaction, from_address, private_key).result()
@@ -0,0 +1,184 @@
+import math
+import threading
+import time
+from concurrent.futures import Future
+from event_log import log_event
+from nonce_manager import is_nonce_error
+
+
+class PendingTransaction:
+    def __init__(self, transaction, from_address, private_key, tx_hash):
+        self.transaction = transaction
+        self.from_address = from_address
+        self.private_key = private_key
+        self.hashes = [bytes(tx_hash)]
+        self.failed = set()
+        self.future = Future()
+        self.sent_at = time.monotonic()
+        self.capped = False
+
+
+class StuckTransactionWatchdog:
+    # Every send is one (account, nonce) slot; when its newest transaction sits unmined past
+    # stuck_after, the same nonce is re-signed with higher fees and all hashes race for the slot.
+    def __init__(self, tx_sender, stuck_after=45, bump_percent=15, max_bumps=5, max_fee=None, poll_interval=None):
+        self.tx_sender = tx_sender
+        self.stuck_after = stuck_after
+        self.bump_percent = bump_percent
+        self.max_bumps = max_bumps
+        self.max_fee = max_fee
+        self.poll_interval = poll_interval or max(stuck_after / 5, 0.5)
+        self.outcomes = []
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='tx-watchdog', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def watch(self, transaction, from_address, private_key, tx_hash, receipt_future):
+        # The returned future resolves with the receipt of whichever hash for this nonce is mined
+        self.start()
+        entry = PendingTransaction(transaction, from_address, private_key, tx_hash)
+        with self._lock:
+            self._pending[(from_address, transaction['nonce'])] = entry
+        receipt_future.add_done_callback(lambda future: self._settle(entry, bytes(tx_hash), future))
+        return entry.future
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            now = time.monotonic()
+            with self._lock:
+                stuck = [
+                    entry for entry in self._pending.values()
+                    if not entry.capped and now - entry.sent_at >= self.stuck_after
+                ]
+            for entry in stuck:
+                try:
+                    self._replace(entry)
+                except Exception as e:
+                    log_event('warning', "Replacement for nonce {nonce} from {account} failed: {error}",
+                              account=entry.from_address, nonce=entry.transaction['nonce'], error=e)
+                    entry.sent_at = time.monotonic()
+
+    def _bumped(self, fee, current):
+        # Nodes only accept a replacement that raises the fee, and never below what the network asks now
+        fee = max(math.ceil(fee * (1 + self.bump_percent / 100)), current or 0)
+        return min(fee, self.max_fee) if self.max_fee else fee
+
+    def _bumped_fees(self, transaction):
+        fee_oracle = self.tx_sender.fee_oracle
+        fee_oracle.invalidate()
+        current = fee_oracle.fee_fields()
+        if 'maxFeePerGas' in transaction:
+            max_fee = self._bumped(transaction['maxFeePerGas'], current.get('maxFeePerGas'))
+            priority_fee = self._bumped(transaction['maxPriorityFeePerGas'], current.get('maxPriorityFeePerGas'))
+            fees = {'maxFeePerGas': max_fee, 'maxPriorityFeePerGas': min(priority_fee, max_fee)}
+            raised = max_fee > transaction['maxFeePerGas']
+        else:
+            fees = {'gasPrice': self._bumped(transaction['gasPrice'], current.get('gasPrice'))}
+            raised = fees['gasPrice'] > transaction['gasPrice']
+        return fees if raised else None
+
+    def _replace(self, entry):
+        if entry.future.done():
+            return
+        nonce = entry.transaction['nonce']
+        fees = self._bumped_fees(entry.transaction) if len(entry.hashes) <= self.max_bumps else None
+        if fees is None:
+            # At the ceiling: the hashes already out keep racing until the receipt timeout
+            entry.capped = True
+            log_event('warning', "Nonce {nonce} from {account} still pending at the fee ceiling after {bumps} bump(s)",
+                      account=entry.from_address, nonce=nonce, bumps=len(entry.hashes) - 1)
+            return
+
+        replacement = dict(entry.transaction, **fees)
+        raw_transaction, tx_hash = self.tx_sender.sign(replacement, entry.private_key)
+        try:
+            receipt_future = self.tx_sender._send_signed(raw_transaction, tx_hash)
+        except Exception as e:
+            message = str(e).lower()
+            if 'underpriced' in message:
+                # The node wants a larger bump, the next attempt bumps again from these fees
+                # and stops at the ceiling once they cannot go higher
+                with self._lock:
+                    entry.transaction = replacement
+                    entry.sent_at = time.monotonic()
+                log_event('warning', "Replacement for nonce {nonce} from {account} rejected as underpriced at {fees}",
+                          account=entry.from_address, nonce=nonce, fees=fees)
+                return
+            if not is_nonce_error(e) and 'already known' not in message:
+                raise
+            # An earlier hash was mined meanwhile, or the node already has this one, a receipt settles the entry
+            entry.sent_at = time.monotonic()
+            return
+
+        with self._lock:
+            entry.transaction = replacement
+            entry.hashes.append(bytes(tx_hash))
+            entry.sent_at = time.monotonic()
+        if entry.future.done():
+            # Settled by an earlier hash while this one was on its way
+            self.tx_sender.receipt_tracker.forget(tx_hash)
+            return
+        receipt_future.add_done_callback(lambda future: self._settle(entry, bytes(tx_hash), future))
+        log_event('warning', "Nonce {nonce} from {account} stuck, replacement {replacement} sent with {fees}",
+                  account=entry.from_address, nonce=nonce, replacement='0x' + bytes(tx_hash).hex(), fees=fees)
+
+    def _settle(self, entry, tx_hash, receipt_future):
+        if receipt_future.cancelled():
+            return
+        error = receipt_future.exception()
+        with self._lock:
+            if entry.future.done():
+                return
+            if error is not None:
+                entry.failed.add(tx_hash)
+                # Other hashes for the nonce may still land, only the last failure settles it
+                if len(entry.failed) < len(entry.hashes):
+                    return
+            self._pending.pop((entry.from_address, entry.transaction['nonce']), None)
+            others = [other for other in entry.hashes if other != tx_hash and other not in entry.failed]
+
+        for other in others:
+            self.tx_sender.receipt_tracker.forget(other)
+        if len(entry.hashes) > 1:
+            self._record(entry, tx_hash, error)
+        if error is not None:
+            entry.future.set_exception(error)
+        else:
+            entry.future.set_result(receipt_future.result())
+
+    def _record(self, entry, tx_hash, error):
+        outcome = {
+            'account': entry.from_address,
+            'nonce': entry.transaction['nonce'],
+            'attempts': len(entry.hashes),
+            'mined': None if error is not None else '0x' + tx_hash.hex(),
+            'status': 'failed' if error is not None else
+                      'original mined' if tx_hash == entry.hashes[0] else 'replacement mined'
+        }
+        with self._lock:
+            self.outcomes.append(outcome)
+        log_event('error' if error is not None else 'ok',
+                  "Nonce {nonce} from {account}: {status} after {attempts} attempt(s)", **outcome)
+
+    def report(self):
+        with self._lock:
+            return list(self.outcomes)